@@ -0,0 +1,109 @@
+import json
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from vertex.lib.processors.chunked import get_transformed_columns, transform_csv_chunked
+
+
+MEMORY_BUDGET_BYTES = 4 * 1024 ** 2
+# the interpreter, pandas parser buffers and I/O threads take some memory that does not depend on the budget
+FIXED_OVERHEAD_BYTES = 40 * 1024 ** 2
+
+# runs in a fresh interpreter, so that the peak RSS of the other tests does not hide the one of the transform
+PEAK_RSS_SCRIPT = """
+import json, os, resource, sys, tempfile
+from vertex.lib.processors.chunked import get_transformed_columns, transform_csv_chunked
+
+input_bytes, memory_budget_bytes = int(sys.argv[1]), int(sys.argv[2])
+with tempfile.TemporaryDirectory() as tmp_dir:
+    input_path, output_path = os.path.join(tmp_dir, "input.csv"), os.path.join(tmp_dir, "output.csv")
+    lines = "".join(f"{i},some text\\n" for i in range(10_000))
+    with open(input_path, "w") as f:
+        f.write("one,two\\n")
+        while f.tell() < input_bytes:
+            f.write(lines)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    transforms = [{"processor": "add_expression_column", "column_name": "three", "expression": "one * 2"}]
+    transform_csv_chunked(input_path, output_path, transforms, memory_budget_bytes)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+print(json.dumps({"peak_rss_increase": rss_after - rss_before}))
+"""
+
+
+def measure_peak_rss_increase(input_bytes: int, memory_budget_bytes: int) -> int:
+    result = subprocess.run(
+        [sys.executable, "-c", PEAK_RSS_SCRIPT, str(input_bytes), str(memory_budget_bytes)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])["peak_rss_increase"]
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="ru_maxrss is in kilobytes on linux only")
+def test_peak_rss_does_not_grow_with_input_size():
+    peak_rss_increases = [
+        measure_peak_rss_increase(input_bytes, MEMORY_BUDGET_BYTES)
+        for input_bytes in (4 * MEMORY_BUDGET_BYTES, 12 * MEMORY_BUDGET_BYTES)
+    ]
+
+    for peak_rss_increase in peak_rss_increases:
+        assert peak_rss_increase < 2 * MEMORY_BUDGET_BYTES + FIXED_OVERHEAD_BYTES
+    assert abs(peak_rss_increases[1] - peak_rss_increases[0]) < MEMORY_BUDGET_BYTES
+
+
+@pytest.fixture
+def chunked_by_two_rows(monkeypatch):
+    # dtypes are inferred on the first two rows only, and the input is read by chunks of two rows
+    monkeypatch.setattr("vertex.lib.processors.chunked.read_csv_sample", lambda uri: pd.read_csv(uri, nrows=2))
+    monkeypatch.setattr("vertex.lib.processors.chunked.estimate_chunk_rows", lambda sample, memory_budget_bytes: 2)
+
+
+def transform_csv_text(tmp_path, input_text, transforms):
+    input_path, output_path = tmp_path / "input.csv", tmp_path / "output.csv"
+    input_path.write_text(input_text)
+    n_rows = transform_csv_chunked(str(input_path), str(output_path), transforms, memory_budget_bytes=1024)
+    assert n_rows == input_text.count("\n") - 1
+    return output_path.read_text()
+
+
+def test_output_formatting_is_the_same_in_all_chunks(tmp_path, chunked_by_two_rows):
+    # the first chunk has no missing value, so pandas would read `two` as int there and as float in the chunks below,
+    # writing 10 in the first chunk and 40.0 in the others. `one` and `name` are passed through as they are, NA included
+    transforms = [{"processor": "add_expression_column", "column_name": "double", "expression": "two * 2"}]
+
+    output_text = transform_csv_text(tmp_path, "one,two,name\n1,10,a\n2,20,b\n3,,c\n,40,NA\n5,50,\n", transforms)
+
+    assert output_text == "one,two,name,double\n1,10,a,20\n2,20,b,40\n3,,c,\n,40,NA,80\n5,50,,100\n"
+
+
+def test_float_columns_stay_floats(tmp_path, chunked_by_two_rows):
+    transforms = [{"processor": "filter_rows", "condition": "price > 0"}]
+
+    output_text = transform_csv_text(tmp_path, "price\n1.0\n2.0\n1.5\n", transforms)
+
+    assert output_text == "price\n1.0\n2.0\n1.5\n"
+
+
+def test_column_falls_back_to_a_wider_dtype_instead_of_failing(tmp_path, chunked_by_two_rows):
+    transforms = [{"processor": "add_expression_column", "column_name": "double", "expression": "price * 2"}]
+
+    output_text = transform_csv_text(tmp_path, "price,flag\n0,true\n1,false\n1.5,x\n", transforms)
+
+    assert output_text == "price,flag,double\n0,true,0\n1,false,2\n1.5,x,3.0\n"
+
+
+def test_get_transformed_columns():
+    transforms = [
+        {"processor": "add_constant_column", "column_name": "x", "constant_value": "a col"},
+        {"processor": "add_expression_column", "column_name": "total", "expression": "one + two"},
+        {"processor": "filter_rows", "condition": "name != 'three' and total > 1"},
+    ]
+
+    assert get_transformed_columns(transforms, ["a", "col", "one", "two", "three", "name", "x"]) == [
+        "one", "two", "name", "x",
+    ]
+    # expressions that can not be tokenized may use any column
+    assert get_transformed_columns([{"processor": "filter_rows", "condition": "`a col` > 1"}], ["a"]) is None
@@ -0,0 +1,130 @@
+import json
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vertex.lib.processors.profiling import (
+    HyperLogLog, TableProfile, compile_profile_query, merge_profiles, parse_profile_row, profile_chunks,
+    profile_to_markdown,
+)
+
+
+def test_sparse_text_column_whose_first_chunk_is_empty():
+    # pandas reads a chunk of empty values as float64
+    chunks = [
+        pd.DataFrame({"comment": [np.nan, np.nan]}),
+        pd.DataFrame({"comment": ["good", np.nan]}),
+        pd.DataFrame({"comment": ["bad", "good"]}),
+    ]
+
+    profile = profile_chunks(chunks)
+
+    assert profile.columns["comment"].numeric is False
+    assert profile.summary()["comment"] == {"null_rate": 0.5, "min": "bad", "max": "good", "approx_distinct": 2}
+
+
+def test_numeric_column_is_demoted_when_a_later_chunk_is_not_numeric():
+    chunks = [pd.DataFrame({"code": [1, 2]}), pd.DataFrame({"code": ["A1", None]})]
+
+    profile = profile_chunks(chunks)
+
+    assert profile.columns["code"].numeric is False
+    assert profile.summary()["code"] == {"null_rate": 0.25, "min": "1.0", "max": "A1", "approx_distinct": 3}
+
+
+def test_column_type_stays_unknown_while_it_has_no_value():
+    profile = profile_chunks([pd.DataFrame({"empty": [np.nan, np.nan]})])
+
+    assert profile.columns["empty"].numeric is None
+    assert profile.summary()["empty"] == {"null_rate": 1.0, "min": None, "max": None, "approx_distinct": 0}
+
+
+def test_distinct_count_does_not_depend_on_the_dtype_of_the_chunk():
+    # the same 100 values, read as int64 in a chunk and as float64 in another one with a missing value
+    chunks = [pd.DataFrame({"id": range(100)}), pd.DataFrame({"id": [*map(float, range(100)), np.nan]})]
+
+    assert profile_chunks(chunks).summary()["id"]["approx_distinct"] == pytest.approx(100, rel=0.05)
+
+
+def test_hyperloglog_estimate():
+    sketch = HyperLogLog()
+    sketch.update(pd.Series(np.arange(50_000)))
+    sketch.update(pd.Series(np.arange(25_000, 100_000)))
+
+    assert sketch.estimate == pytest.approx(100_000, rel=0.05)
+
+
+def test_merged_shard_profiles_match_the_whole_table_profile():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"value": rng.normal(size=10_000), "category": rng.integers(0, 100, size=10_000).astype(str)})
+    df.loc[::10, "value"] = np.nan
+    shards = [df.iloc[:2_500], df.iloc[2_500:]]
+
+    # shard profiles go through json like between merge_profiles_component and the components that profile shards
+    shard_profiles = [
+        TableProfile.from_dict(json.loads(json.dumps(profile_chunks([shard]).to_dict()))) for shard in shards
+    ]
+    summary = merge_profiles(shard_profiles).summary()
+
+    assert summary["value"]["null_rate"] == pytest.approx(0.1)
+    assert summary["value"]["mean"] == pytest.approx(df["value"].mean())
+    assert summary["value"]["variance"] == pytest.approx(df["value"].var())
+    assert summary["value"]["min"] == df["value"].min()
+    assert summary["value"]["p50"] == pytest.approx(df["value"].median(), abs=0.05)
+    assert summary["category"]["approx_distinct"] == pytest.approx(100, rel=0.05)
+
+
+def test_merge_demotes_a_numeric_shard_profile():
+    numeric_profile = profile_chunks([pd.DataFrame({"code": [1, 2]})])
+    text_profile = profile_chunks([pd.DataFrame({"code": ["A1"]})])
+
+    summary = merge_profiles([numeric_profile, text_profile]).summary()["code"]
+
+    assert summary == {"null_rate": 0.0, "min": "1.0", "max": "A1", "approx_distinct": 3}
+
+
+def test_decimal_columns_are_numeric():
+    # BigQuery NUMERIC columns are read as Decimal objects
+    chunks = [pd.DataFrame({"amount": [Decimal("9.5"), Decimal("10"), None]})]
+
+    summary = profile_chunks(chunks).summary()["amount"]
+
+    assert (summary["min"], summary["max"], summary["mean"]) == (9.5, 10.0, pytest.approx(9.75))
+    assert summary["approx_distinct"] == 2
+
+
+BQ_SCHEMA = [("amount", "NUMERIC", "NULLABLE"), ("name", "STRING", "NULLABLE"), ("tags", "STRING", "REPEATED")]
+
+
+def test_compile_profile_query():
+    query = compile_profile_query(BQ_SCHEMA, "`project.dataset.table`")
+
+    assert query.startswith("SELECT\n    COUNT(*) AS row_count,\n")
+    assert query.endswith("\nFROM `project.dataset.table`")
+    assert "APPROX_QUANTILES(`amount`, 100) AS c0_quantiles" in query
+    assert "MIN(CAST(`name` AS STRING)) AS c1_min" in query
+    assert "VAR_SAMP(CAST(`name` AS STRING))" not in query
+    assert "APPROX_COUNT_DISTINCT(TO_JSON_STRING(`tags`)) AS c2_approx_distinct" in query
+    assert "c2_min" not in query
+
+
+def test_parse_profile_row():
+    row = {
+        "row_count": 4,
+        "c0_null_count": 1, "c0_min": Decimal("1"), "c0_max": Decimal("10.5"), "c0_approx_distinct": 3,
+        "c0_mean": Decimal("5"), "c0_variance": 20.25, "c0_quantiles": [Decimal(i) / 10 for i in range(101)],
+        "c1_null_count": 0, "c1_min": "a", "c1_max": "c", "c1_approx_distinct": 3,
+        "c2_null_count": 4, "c2_approx_distinct": 0,
+    }
+
+    summaries = parse_profile_row(row, BQ_SCHEMA)
+
+    assert summaries["amount"] == {
+        "null_rate": 0.25, "min": 1.0, "max": 10.5, "approx_distinct": 3, "mean": 5.0, "variance": 20.25,
+        "p5": 0.5, "p25": 2.5, "p50": 5.0, "p75": 7.5, "p95": 9.5,
+    }
+    assert summaries["name"] == {"null_rate": 0.0, "min": "a", "max": "c", "approx_distinct": 3}
+    assert summaries["tags"] == {"null_rate": 1.0, "min": None, "max": None, "approx_distinct": 0}
+    assert "| amount | 0.25 | 1 | 10.5 | 3 | 5 | 20.25 |" in profile_to_markdown(summaries)
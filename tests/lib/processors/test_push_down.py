@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from vertex.lib.connectors import bigquery
+from vertex.lib.processors.push_down import NotCompilableError, compile_transforms, run_transforms_sqlite
+from vertex.lib.processors.transform_data import apply_transforms
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "one": [1., 2., 0., np.nan, -3., 5.],
+        "two": [2., 0., 0., 4., 0., 3.],
+        "name": ["a", "b", None, "c", "d", "it's"],
+    })
+
+
+@pytest.mark.parametrize("transforms", [
+    [{"processor": "add_constant_column", "column_name": "new_column", "constant_value": "it's a value"}],
+    [{"processor": "add_constant_column", "column_name": "one", "constant_value": 1.5}],
+    [{"processor": "add_expression_column", "column_name": "ratio", "expression": "(one + two) / one"}],
+    [{"processor": "add_expression_column", "column_name": "ratio", "expression": "one / two"}],
+    [{"processor": "add_expression_column", "column_name": "value", "expression": "-one * 2 + two - 1.5"}],
+    [{"processor": "add_expression_column", "column_name": "is_big", "expression": "one > 1"}],
+    [{"processor": "cast_column", "column_name": "two", "dtype": "int"}],
+    [{"processor": "filter_rows", "condition": "name != 'c'"}],
+    [{"processor": "filter_rows", "condition": "name == 'a' or one >= 2"}],
+    [{"processor": "filter_rows", "condition": "not one > 1"}],
+    [{"processor": "filter_rows", "condition": "one / two > 1"}],
+    [
+        {"processor": "add_expression_column", "column_name": "total", "expression": "one + two"},
+        {"processor": "add_expression_column", "column_name": "one", "expression": "total * 2"},
+        {"processor": "filter_rows", "condition": "total >= 2 and name != 'b'"},
+    ],
+])
+def test_sql_is_equivalent_to_pandas(df, transforms):
+    expected = apply_transforms(df.copy(), transforms).reset_index(drop=True)
+
+    result = run_transforms_sqlite(df, transforms)
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("transform", [
+    {"processor": "add_expression_column", "column_name": "square", "expression": "one ** 2"},
+    {"processor": "add_expression_column", "column_name": "half", "expression": "one // 2"},
+    {"processor": "add_expression_column", "column_name": "absolute", "expression": "abs(one)"},
+    {"processor": "add_expression_column", "column_name": "unknown", "expression": "three + 1"},
+    {"processor": "filter_rows", "condition": "one < two < 3"},
+    {"processor": "filter_rows", "condition": "one = 1"},
+    {"processor": "filter_rows", "condition": "(one > 1"},
+    {"processor": "cast_column", "column_name": "two", "dtype": "datetime64[ns]"},
+    {"processor": "cast_column", "column_name": "two", "dtype": "str"},
+    {"processor": "cast_column", "column_name": "name", "dtype": "bool"},
+    {"processor": "add_constant_column", "column_name": "missing", "constant_value": float("nan")},
+    {"processor": "add_constant_column", "column_name": "infinite", "constant_value": float("-inf")},
+    {"processor": "drop_duplicates"},
+])
+def test_unsupported_transforms_are_not_compilable(transform):
+    with pytest.raises(NotCompilableError):
+        compile_transforms([transform], ["one", "two", "name"], "source")
+
+
+def test_cast_to_int_truncates_like_pandas():
+    df = pd.DataFrame({"value": [2.7, -2.7, 2.5, -0.5]})
+    transforms = [{"processor": "cast_column", "column_name": "value", "dtype": "int"}]
+
+    result = run_transforms_sqlite(df, transforms)
+
+    assert result["value"].tolist() == apply_transforms(df.copy(), transforms)["value"].tolist() == [2, -2, 2, 0]
+    # BigQuery rounds when casting, sqlite does not, so the query is checked instead
+    assert "CAST(TRUNC(`value`) AS INT64) AS `value`" in compile_transforms(transforms, ["value"], "source")
+
+
+def test_bigquery_division_follows_ieee_semantics():
+    query = compile_transforms(
+        [{"processor": "add_expression_column", "column_name": "ratio", "expression": "one / two"}],
+        ["one", "two"],
+        "`project.dataset.table`",
+    )
+
+    assert "IEEE_DIVIDE((`one`), (`two`)) AS `ratio`" in query
+
+
+class FakeBigQueryClient:
+    queries = []
+
+    def __init__(self, location, project):
+        pass
+
+    def get_table(self, table):
+        return type("Table", (), {"schema": [type("Field", (), {"name": name}) for name in ["one", "two", "name"]]})
+
+    def query(self, query, location):
+        self.queries.append(query)
+        return type("QueryJob", (), {"result": lambda self: None})()
+
+
+@pytest.fixture
+def fake_bigquery(monkeypatch, df):
+    saved = {}
+    FakeBigQueryClient.queries = []
+    monkeypatch.setattr(bigquery.bigquery, "Client", FakeBigQueryClient)
+    monkeypatch.setattr(bigquery, "load_data_bq", lambda project_id, gcp_region, input_table: df.copy())
+    monkeypatch.setattr(bigquery, "save_data_bq", lambda df, project_id, output_table: saved.update(df=df))
+    return saved
+
+
+def test_transform_data_bq_pushes_down_compilable_transforms(fake_bigquery):
+    transforms = [{"processor": "filter_rows", "condition": "one > 1"}]
+
+    bigquery.transform_data_bq("project", "europe-west1", "dataset.input", "dataset.output", transforms)
+
+    assert len(FakeBigQueryClient.queries) == 1
+    assert FakeBigQueryClient.queries[0].startswith("CREATE OR REPLACE TABLE `project.dataset.output` AS\nSELECT")
+    assert "df" not in fake_bigquery
+
+
+def test_transform_data_bq_falls_back_to_pandas(fake_bigquery, df):
+    transforms = [
+        {"processor": "filter_rows", "condition": "one > 1"},
+        {"processor": "add_expression_column", "column_name": "square", "expression": "one ** 2"},
+    ]
+
+    bigquery.transform_data_bq("project", "europe-west1", "dataset.input", "dataset.output", transforms)
+
+    assert FakeBigQueryClient.queries == []
+    pd.testing.assert_frame_equal(fake_bigquery["df"], apply_transforms(df.copy(), transforms))
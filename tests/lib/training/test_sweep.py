@@ -0,0 +1,53 @@
+import math
+
+import pytest
+
+from vertex.lib.training.sweep import (
+    generate_trials, rung_budgets, run_successive_halving, select_best, select_survivors,
+)
+
+
+# converges towards a score that is best for learning_rate=0.1 and depth=4
+def toy_objective(params, budget):
+    best_score = 1 - abs(math.log10(params["learning_rate"]) + 1) - abs(params["depth"] - 4) / 10
+    return best_score * (1 - math.exp(-budget / 30))
+
+
+@pytest.fixture
+def trials():
+    return generate_trials({"learning_rate": [0.001, 0.01, 0.1, 1.], "depth": [2, 4, 6, 8]})
+
+
+def test_rung_budgets():
+    assert rung_budgets(min_budget=10, max_budget=270, eta=3) == [10, 30, 90, 270]
+    assert rung_budgets(min_budget=10, max_budget=100, eta=3) == [11, 33, 100]
+
+
+def test_successive_halving_rung_sizes(trials):
+    budgets = rung_budgets(min_budget=10, max_budget=90, eta=3)
+
+    rungs = run_successive_halving(trials, toy_objective, budgets, eta=3)
+
+    assert [len(results) for results in rungs] == [16, 5, 1]
+    assert [{result["budget"] for result in results} for results in rungs] == [{10}, {30}, {90}]
+
+
+def test_successive_halving_keeps_the_best_trial(trials):
+    rungs = run_successive_halving(trials, toy_objective, rung_budgets(10, 90, 3), eta=3)
+
+    for results in rungs:
+        assert {"learning_rate": 0.1, "depth": 4} in [result["params"] for result in results]
+    assert select_best(rungs[-1])["params"] == {"learning_rate": 0.1, "depth": 4}
+
+
+def test_select_survivors_keeps_what_is_needed_to_warm_start():
+    results = [
+        {"trial_id": 0, "params": {"alpha": 0.1}, "budget": 10, "score": 0.5, "model_uri": "gs://bucket/0"},
+        {"trial_id": 1, "params": {"alpha": 0.01}, "budget": 10, "score": float("nan"), "model_uri": "gs://bucket/1"},
+        {"trial_id": 2, "params": {"alpha": 0.001}, "budget": 10, "score": 0.9, "model_uri": "gs://bucket/2"},
+    ]
+
+    assert select_survivors(results, eta=3) == [
+        {"trial_id": 2, "params": {"alpha": 0.001}, "budget": 10, "model_uri": "gs://bucket/2"},
+    ]
+    assert select_survivors(results, eta=3, maximize=False)[0]["trial_id"] == 0
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from vertex.lib.training.train import train_and_evaluate
+
+
+PARAMS = {"alpha": 0.0001, "learning_rate": "invscaling", "eta0": 0.01}
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"])
+    df["target"] = 2 * df["a"] - df["b"] + 0.1 * rng.normal(size=200)
+    return df
+
+
+def test_warm_start_gives_the_same_model_as_training_from_scratch(df):
+    model_from_scratch, score_from_scratch, _ = train_and_evaluate(df, "target", PARAMS, budget=30)
+
+    model, _, _ = train_and_evaluate(df, "target", PARAMS, budget=10)
+    model, score, learning_curve = train_and_evaluate(df, "target", PARAMS, budget=30, model=model, trained_budget=10)
+
+    np.testing.assert_allclose(model.coef_, model_from_scratch.coef_)
+    assert score == pytest.approx(score_from_scratch)
+    # only the epochs that were not done in the previous rung are trained and reported
+    assert [point["epoch"] for point in learning_curve] == [20, 30]
+
+
+def test_learning_curve_reports_intermediate_scores(df):
+    _, score, learning_curve = train_and_evaluate(df, "target", PARAMS, budget=25, eval_every=10)
+
+    assert [point["epoch"] for point in learning_curve] == [10, 20, 25]
+    assert learning_curve[-1]["score"] == score
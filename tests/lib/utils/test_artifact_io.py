@@ -0,0 +1,116 @@
+import io
+import os
+
+import pytest
+from fsspec.implementations.dirfs import DirFileSystem
+from fsspec.implementations.local import LocalFileSystem
+
+from vertex.lib.utils.artifact_io import (
+    MAX_PARTS_PER_MERGE, ParallelMultipartWriter, ParallelRangeReader, buffer_size_for_budget, open_artifact,
+    resolve_filesystem,
+)
+
+
+DATA = bytes(range(256)) * 40
+
+
+class ComposingFileSystem(DirFileSystem):
+    """Local directory with a server side merge, like GCS compose, that records the parts of every merge."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.merges = []
+
+    def merge(self, path, paths):
+        self.merges.append(len(paths))
+        with self.open(path, "wb") as f:
+            for part in paths:
+                f.write(self.cat_file(part))
+
+
+@pytest.fixture
+def fs(tmp_path):
+    return DirFileSystem(path=str(tmp_path), fs=LocalFileSystem(auto_mkdir=True))
+
+
+@pytest.fixture
+def composing_fs(tmp_path):
+    return ComposingFileSystem(path=str(tmp_path), fs=LocalFileSystem(auto_mkdir=True))
+
+
+def test_resolve_filesystem_with_local_root(tmp_path):
+    fs, path = resolve_filesystem("/gcs/bucket/root/artifact.csv", local_root=str(tmp_path))
+
+    assert path == "bucket/root/artifact.csv"
+    fs.pipe_file(path, b"data")
+    assert (tmp_path / "bucket" / "root" / "artifact.csv").read_bytes() == b"data"
+
+
+def test_buffer_size_for_budget():
+    # a reader and a writer keep up to 2 * (max_workers + 2) buffers
+    assert buffer_size_for_budget(120 * 1024 ** 2, max_workers=4) == 10 * 1024 ** 2
+    assert buffer_size_for_budget(1024, max_workers=4) == 256 * 1024
+
+
+@pytest.mark.parametrize("mode", ["b", "t"])
+def test_round_trip(tmp_path, mode):
+    data = DATA if mode == "b" else "é,text\n" * 1000
+    uri = "gs://bucket/artifact"
+
+    with open_artifact(uri, "w" + mode, local_root=str(tmp_path), part_size=1000) as f:
+        f.write(data)
+    with open_artifact(uri, "r" + mode, local_root=str(tmp_path), block_size=1000) as f:
+        assert f.read() == data
+
+    assert os.listdir(tmp_path / "bucket") == ["artifact"]
+
+
+def test_seek_and_partial_reads(fs):
+    fs.pipe_file("artifact", DATA)
+    reader = ParallelRangeReader(fs, "artifact", block_size=100, read_ahead=2)
+
+    for position in [250, 10, 9_000, 250, len(DATA) - 5]:
+        reader.seek(position)
+        assert reader.read(30) == DATA[position:position + 30]
+        assert reader.tell() == min(position + 30, len(DATA))
+        # blocks before the position, or further than read_ahead after it, are evicted
+        current_block = position // 100
+        assert all(current_block <= block <= current_block + 2 for block in reader._blocks)
+
+    reader.seek(-10, io.SEEK_END)
+    assert reader.read() == DATA[-10:]
+    assert reader.read() == b""
+    reader.close()
+
+
+def test_multipart_write_merges_groups_of_parts(composing_fs):
+    writer = ParallelMultipartWriter(composing_fs, "artifact", part_size=100)
+    writer.write(DATA)
+    writer.close()
+
+    assert composing_fs.cat_file("artifact") == DATA
+    # 103 parts are merged in groups of 32 parts at most, then the groups are merged into the file
+    assert composing_fs.merges == [MAX_PARTS_PER_MERGE, MAX_PARTS_PER_MERGE, MAX_PARTS_PER_MERGE, 7, 4]
+    assert composing_fs.ls("", detail=False) == ["artifact"]
+
+
+def test_multipart_write_without_merge_concatenates_parts(fs):
+    writer = ParallelMultipartWriter(fs, "artifact", part_size=100)
+    writer.write(DATA)
+    writer.close()
+
+    assert fs.cat_file("artifact") == DATA
+    assert fs.ls("", detail=False) == ["artifact"]
+
+
+@pytest.mark.parametrize("mode", ["wb", "w"])
+def test_failed_write_is_not_published(tmp_path, mode):
+    data = DATA if mode == "wb" else "text\n" * 2000
+
+    with pytest.raises(RuntimeError):
+        with open_artifact("gs://bucket/artifact", mode, local_root=str(tmp_path), part_size=1000) as f:
+            f.write(data)
+            raise RuntimeError("failed while writing")
+
+    # neither the file nor its parts are left behind
+    assert os.listdir(tmp_path / "bucket") == []
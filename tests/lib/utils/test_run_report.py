@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from vertex.lib.utils.run_report import (
+    build_run_report, compute_critical_path, compute_task_timings, format_markdown_report, format_run_report,
+    get_task_dependencies,
+)
+
+
+# pipeline job recorded with `pipeline_job_to_dict`: an ExitHandler wraps a data loading task and a Condition, that
+# contains a ParallelFor over two iterations (train then evaluate) followed by an aggregation task
+@pytest.fixture
+def pipeline_job():
+    with open(Path(__file__).parent.parent.parent / "fixtures" / "pipeline_job.json") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def dependencies(pipeline_job):
+    return get_task_dependencies(pipeline_job["pipeline_spec"])
+
+
+@pytest.fixture
+def timings(pipeline_job, dependencies):
+    return compute_task_timings(pipeline_job["job_detail"]["task_details"], dependencies)
+
+
+def test_get_task_dependencies(dependencies):
+    assert {name: sorted(upstream) for name, upstream in dependencies.items()} == {
+        "load-data-component": [],
+        "train-component": ["load-data-component"],
+        "evaluate-component": ["load-data-component", "train-component"],
+        "aggregate-component": ["evaluate-component", "load-data-component", "train-component"],
+        "run-report-component": [
+            "aggregate-component", "evaluate-component", "load-data-component", "train-component"
+        ],
+    }
+
+
+def test_compute_task_timings_ignores_sub_dags_and_running_tasks(timings):
+    assert sorted(timing["task_id"] for timing in timings) == ["102", "107", "108", "109", "110", "111"]
+
+
+def test_compute_task_timings(timings):
+    load_timing = next(timing for timing in timings if timing["task_id"] == "102")
+
+    assert load_timing["queue_seconds"] == pytest.approx(40.570718)
+    assert load_timing["run_seconds"] == pytest.approx(88.784694)
+    assert load_timing["ancestors"] == ["100", "101"]
+
+
+def test_compute_critical_path_follows_the_right_parallel_for_iteration(timings, dependencies):
+    critical_path = compute_critical_path(timings, dependencies)
+
+    assert [timing["task_id"] for timing in critical_path] == ["102", "108", "110", "111"]
+
+
+def test_compute_critical_path_without_timings(dependencies):
+    assert compute_critical_path([], dependencies) == []
+
+
+def test_build_run_report(pipeline_job):
+    run_report = build_run_report(pipeline_job)
+
+    assert run_report["tasks"][0]["task_id"] == "110"
+    assert run_report["critical_path_seconds"] == pytest.approx(682.797282)
+    assert format_markdown_report(run_report).count("| yes |") == 4
+
+
+def test_format_run_report(pipeline_job):
+    slack_summary, markdown_report = format_run_report(pipeline_job, n_slowest_tasks=2)
+
+    assert slack_summary.startswith("*Critical path (11m23s):* load-data-component → train-component")
+    assert markdown_report.count("| yes |") == 4
+
+
+def test_format_run_report_when_timings_can_not_be_computed(pipeline_job):
+    # e.g. a task detail without its task_id
+    del pipeline_job["job_detail"]["task_details"][2]["task_id"]
+
+    slack_summary, markdown_report = format_run_report(pipeline_job)
+
+    assert slack_summary.startswith("*Timings unavailable:*")
+    assert "Timings unavailable" in markdown_report
@@ -0,0 +1,36 @@
+import importlib
+
+import pytest
+
+# dsl.Collected outputs consumed by a component whose output feeds the next ParallelFor need kfp>=2.5
+pytest.importorskip("kfp")
+pytest.importorskip("google.cloud.aiplatform")
+
+from kfp import compiler  # noqa: E402
+
+
+@pytest.mark.parametrize("pipeline_module", ["my_first_pipeline", "hyperparameter_sweep"])
+def test_pipeline_compiles(pipeline_module, tmp_path):
+    pipeline = importlib.import_module(f"vertex.pipelines.{pipeline_module}").pipeline
+
+    compiler.Compiler().compile(pipeline_func=pipeline, package_path=str(tmp_path / "pipeline.yaml"))
+
+    assert (tmp_path / "pipeline.yaml").stat().st_size > 0
+
+
+def test_hyperparameter_sweep_chains_rungs_through_survivors(tmp_path):
+    import yaml
+    from vertex.pipelines.hyperparameter_sweep import BUDGETS, PARALLELISM, pipeline
+
+    compiler.Compiler().compile(pipeline_func=pipeline, package_path=str(tmp_path / "pipeline.yaml"))
+
+    with open(tmp_path / "pipeline.yaml") as f:
+        tasks = yaml.safe_load(f)["root"]["dag"]["tasks"]
+    rungs = [tasks[f"for-loop-{i + 1}"] for i in range(len(BUDGETS))]
+    assert [rung["iteratorPolicy"]["parallelismLimit"] for rung in rungs] == [PARALLELISM] * len(BUDGETS)
+    # every rung after the first one iterates over the survivors of the previous one
+    for i, rung in enumerate(rungs[1:], start=1):
+        survivors_task = "select-survivors-component" + (f"-{i}" if i > 1 else "")
+        assert survivors_task in rung["dependentTasks"]
+        assert tasks[survivors_task]["dependentTasks"] == [f"for-loop-{i}"]
+    assert tasks["select-best-trial-component"]["dependentTasks"] == [f"for-loop-{len(BUDGETS)}"]
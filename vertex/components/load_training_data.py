@@ -0,0 +1,19 @@
+from kfp.dsl import component, Dataset, Output
+import os
+
+
+# This is a component that loads a training set from BQ once and saves it as parquet, which is much faster to read
+# than csv for the many training tasks of a hyperparameter sweep
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def load_training_data_component(
+    project_id: str,
+    gcp_region: str,
+    input_table: str,
+    training_data: Output[Dataset]
+):
+    from vertex.lib.connectors.bigquery import load_data_bq
+
+    df = load_data_bq(project_id, gcp_region, input_table)
+
+    training_data.metadata["format"] = "parquet"
+    df.to_parquet(training_data.uri, index=False)
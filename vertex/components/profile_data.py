@@ -0,0 +1,75 @@
+from typing import List
+
+from kfp.dsl import component, Artifact, Dataset, Input, Markdown, Metrics, Output
+import os
+
+
+# This is a component that computes per-column statistics of a dataset in a single pass over chunks of it, so it runs
+# with constant memory. It can run in parallel with the component that saves the dataset.
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def profile_data_component(
+    df: Input[Dataset],
+    profile: Output[Artifact],
+    metrics: Output[Metrics],
+    report: Output[Markdown],
+    chunk_rows: int = 100_000,
+):
+    import json
+
+    from vertex.lib.processors.chunked import read_csv_chunks
+    from vertex.lib.processors.profiling import log_profile_metrics, profile_chunks, profile_to_markdown
+
+    table_profile = profile_chunks(read_csv_chunks(df.uri, chunk_rows))
+
+    # the full profile is saved so that profiles of shards of a table can be merged with merge_profiles_component
+    with open(profile.path, "w") as f:
+        json.dump(table_profile.to_dict(), f)
+    log_profile_metrics(table_profile, metrics)
+    with open(report.path, "w") as f:
+        f.write(profile_to_markdown(table_profile))
+
+
+# This is the same component for a BQ table, e.g. the output of transform_data_bq_component. The statistics are
+# computed by a query, so the data never leaves BigQuery. Its approximate statistics come from BigQuery sketches, that
+# can not be merged with merge_profiles_component.
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def profile_data_bq_component(
+    project_id: str,
+    gcp_region: str,
+    input_table: str,
+    metrics: Output[Metrics],
+    report: Output[Markdown],
+):
+    from vertex.lib.connectors.bigquery import profile_data_bq
+    from vertex.lib.processors.profiling import log_profile_metrics, profile_to_markdown
+
+    summaries = profile_data_bq(project_id, gcp_region, input_table)
+
+    log_profile_metrics(summaries, metrics)
+    with open(report.path, "w") as f:
+        f.write(profile_to_markdown(summaries))
+
+
+# This is a component that merges the profiles of shards of a table, e.g. collected from a ParallelFor
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def merge_profiles_component(
+    profiles: Input[List[Artifact]],
+    profile: Output[Artifact],
+    metrics: Output[Metrics],
+    report: Output[Markdown],
+):
+    import json
+
+    from vertex.lib.processors.profiling import TableProfile, log_profile_metrics, merge_profiles, profile_to_markdown
+
+    def load_profile(artifact):
+        with open(artifact.path) as f:
+            return TableProfile.from_dict(json.load(f))
+
+    table_profile = merge_profiles(load_profile(artifact) for artifact in profiles)
+
+    with open(profile.path, "w") as f:
+        json.dump(table_profile.to_dict(), f)
+    log_profile_metrics(table_profile, metrics)
+    with open(report.path, "w") as f:
+        f.write(profile_to_markdown(table_profile))
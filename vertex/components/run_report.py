@@ -0,0 +1,83 @@
+from kfp.dsl import component, Markdown, Output, PipelineTaskFinalStatus
+import os
+
+
+# This is an example of exit handler component that reports the final state of the pipeline job, along with the time
+# spent queuing and running in each task and the critical path of the run. The report is sent to Slack (or logged)
+# and saved as a Markdown artifact. It runs on the base image, so there is no package to install when the pipeline ends.
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def run_report_component(
+    project_id: str,
+    pipeline_task_final_status: PipelineTaskFinalStatus,
+    run_report: Output[Markdown],
+    slack_webhook_url_secret_name: str = "",
+    n_slowest_tasks: int = 5,
+):
+    import logging
+    from zoneinfo import ZoneInfo
+
+    import requests
+    from google.cloud import aiplatform
+    from google.cloud.secretmanager import SecretManagerServiceClient
+    from vertex.lib.utils.run_report import format_run_report
+
+    logging.getLogger().setLevel(logging.INFO)
+
+    # the job is fetched once, task details and pipeline spec are then read from the same response
+    pipeline_job = aiplatform.PipelineJob.get(
+        resource_name=pipeline_task_final_status.pipeline_job_resource_name
+    )
+    # never fails, so that the notification is sent even if the timings can not be computed
+    timing_details, markdown_report = format_run_report(pipeline_job, n_slowest_tasks)
+
+    emojis = {
+        "SUCCEEDED": ["✅", ":risibeer:"],
+        "FAILED": ["❌", ":risicry:"],
+        "CANCELLED": ["🚫", "🚫"],
+    }
+
+    TIMEZONE = "Europe/Paris"
+
+    status = pipeline_task_final_status.state
+    project = pipeline_task_final_status.pipeline_job_resource_name.split("/")[1]
+    pipeline_name = pipeline_task_final_status.pipeline_job_resource_name.split("/")[5]
+    pipeline_job_id = pipeline_task_final_status.pipeline_job_resource_name
+    start_time = (
+        f"{pipeline_job.create_time.astimezone(tz=ZoneInfo(TIMEZONE)).isoformat()} {TIMEZONE}"
+    )
+    console_link = pipeline_job._dashboard_uri()
+
+    title_str = f"{emojis[status][0]} Vertex Pipelines job *{pipeline_name}* ended with the following state: *{status}* {emojis[status][1]}."  # noqa: E501
+
+    additional_details = f"""*Additional details:*
+    - *Project:* {project}
+    - *Pipeline name:* {pipeline_name}
+    - *Pipeline job ID:* {pipeline_job_id}
+    - *Start time:* {start_time}
+
+To view this pipeline job in Cloud Console, use the following link: {console_link}
+"""
+    with open(run_report.path, "w") as f:
+        f.write(markdown_report)
+
+    notification_json = {
+        "blocks": [
+            {"type": "section", "text": {"type": "mrkdwn", "text": title_str}},
+            {"type": "section", "text": {"type": "mrkdwn", "text": additional_details}},
+            {"type": "section", "text": {"type": "mrkdwn", "text": timing_details}},
+        ]
+    }
+
+    if slack_webhook_url_secret_name:
+        client = SecretManagerServiceClient()
+        name = f"projects/{project_id}/secrets/{slack_webhook_url_secret_name}/versions/latest"
+        slack_webhook_url = client.access_secret_version(name=name).payload.data.decode("UTF-8")
+
+        response = requests.post(
+            slack_webhook_url,
+            json=notification_json,
+            headers={"Content-type": "application/json"},
+        )
+        response.raise_for_status()
+    else:
+        logging.info(title_str + "\n" + additional_details + "\n" + timing_details)
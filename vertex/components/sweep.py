@@ -0,0 +1,46 @@
+from typing import List, NamedTuple
+
+from kfp.dsl import component, Model, Output
+import os
+
+
+# These are the components that schedule the trials of a hyperparameter sweep with successive halving.
+# The logic lives in vertex.lib.training.sweep so it can be tested locally with a toy objective.
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def generate_trials_component(param_grid: dict) -> List[dict]:
+    from vertex.lib.training.sweep import generate_trials
+
+    return generate_trials(param_grid)
+
+
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def select_survivors_component(results: List[dict], eta: int, maximize: bool = True) -> List[dict]:
+    import logging
+    from vertex.lib.training.sweep import select_survivors
+
+    survivors = select_survivors(results, eta, maximize)
+    logging.info(f"{len(survivors)} out of {len(results)} trials go to the next rung")
+    return survivors
+
+
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def select_best_trial_component(
+    results: List[dict],
+    best_model: Output[Model],
+    maximize: bool = True,
+) -> NamedTuple("Outputs", [("best_params", dict), ("best_score", float)]):
+    import logging
+    from collections import namedtuple
+
+    import fsspec
+    from vertex.lib.training.sweep import select_best
+
+    best_result = select_best(results, maximize)
+    logging.info(f"best trial: {best_result}")
+
+    with fsspec.open(best_result["model_uri"], "rb") as source, fsspec.open(best_model.uri, "wb") as destination:
+        destination.write(source.read())
+    best_model.metadata.update({"params": best_result["params"], "score": best_result["score"]})
+
+    outputs = namedtuple("Outputs", ["best_params", "best_score"])
+    return outputs(best_result["params"], best_result["score"])
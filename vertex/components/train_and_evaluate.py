@@ -0,0 +1,41 @@
+from kfp.dsl import component, Dataset, Input, Metrics, Model, Output
+import os
+
+
+# This is a component that evaluates a single trial of a hyperparameter sweep with a given budget.
+# A trial promoted from a previous rung continues from the model it trained there. Intermediate scores are logged as
+# metrics of the rung, and the final score is returned so the next rung can prune the worst trials.
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def train_and_evaluate_component(
+    training_data: Input[Dataset],
+    trial: dict,
+    budget: int,
+    target_column: str,
+    model: Output[Model],
+    metrics: Output[Metrics],
+) -> dict:
+    import pickle
+
+    import fsspec
+    import pandas as pd
+    from vertex.lib.training.train import train_and_evaluate
+
+    df = pd.read_parquet(training_data.uri)
+
+    previous_model = None
+    if "model_uri" in trial:
+        with fsspec.open(trial["model_uri"], "rb") as f:
+            previous_model = pickle.load(f)
+
+    trained_model, score, learning_curve = train_and_evaluate(
+        df, target_column, trial["params"], budget, model=previous_model, trained_budget=trial.get("budget", 0)
+    )
+
+    metrics.log_metric("budget", budget)
+    metrics.log_metric("score", score)
+    for point in learning_curve:
+        metrics.log_metric(f"score_epoch_{point['epoch']}", point["score"])
+    with fsspec.open(model.uri, "wb") as f:
+        pickle.dump(trained_model, f)
+
+    return {**trial, "budget": budget, "score": score, "model_uri": model.uri}
@@ -3,23 +3,21 @@ import os
 
 # This is a component add a constant column to pandas dataframe
 # This is an example of intermediary component that loads data from a previous component and saves data for next one.
+# The data is streamed by chunks that fit in memory_budget_mb, so the component does not need a machine that can hold
+# the whole table in memory.
 @component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
 def transform_data_component(
     df: Input[Dataset],
     column_name: str,
     constant_value: str,
-    df_transformed_dataset: Output[Dataset]
+    df_transformed_dataset: Output[Dataset],
+    memory_budget_mb: int = 256,
 ):
-    import pandas as pd
-    from vertex.lib.processors.transform_data import add_constant_column
-
-    # this is a vertex specific way of loading data so it is not included in add_constant_column function
-    df = pd.read_csv(df.uri)
-
-    df_transformed = add_constant_column(df, column_name, constant_value)
-
-    # this is a vertex specific way of saving data so it is not included in add_constant_column function
-    df_transformed.to_csv(df_transformed_dataset.uri, index=False)
-
+    from vertex.lib.processors.chunked import transform_csv_chunked
 
+    transforms = [
+        {"processor": "add_constant_column", "column_name": column_name, "constant_value": constant_value},
+    ]
 
+    # this is a vertex specific way of loading and saving data so it is not included in the processors
+    transform_csv_chunked(df.uri, df_transformed_dataset.uri, transforms, memory_budget_mb * 1024 ** 2)
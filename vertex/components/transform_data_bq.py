@@ -0,0 +1,22 @@
+from kfp.dsl import component
+import os
+
+# This is a component that adds a constant column to a BQ table without taking the data out of BigQuery.
+# It replaces the load -> transform -> save components when the transforms can be compiled to SQL, and falls back to
+# pandas within the component otherwise.
+@component(base_image=f'europe-west1-docker.pkg.dev/{os.getenv("PROJECT_ID")}/vertex-pipelines-docker/vertex-pipelines-base:latest')
+def transform_data_bq_component(
+    project_id: str,
+    gcp_region: str,
+    input_table: str,
+    output_table: str,
+    column_name: str,
+    constant_value: str,
+):
+    from vertex.lib.connectors.bigquery import transform_data_bq
+
+    transforms = [
+        {"processor": "add_constant_column", "column_name": column_name, "constant_value": constant_value},
+    ]
+
+    transform_data_bq(project_id, gcp_region, input_table, output_table, transforms)
@@ -3,10 +3,19 @@ import os
 from google.cloud import bigquery
 import pandas_gbq
 import google.cloud.logging
-client = google.cloud.logging.Client()
-client.setup_logging()
+from google.auth.exceptions import DefaultCredentialsError
+try:
+    client = google.cloud.logging.Client()
+    client.setup_logging()
+except DefaultCredentialsError:
+    # running without GCP credentials, e.g. in tests: logs stay local
+    pass
 import logging
 
+from vertex.lib.processors.profiling import compile_profile_query, parse_profile_row
+from vertex.lib.processors.push_down import NotCompilableError, compile_transforms
+from vertex.lib.processors.transform_data import apply_transforms
+
 
 def save_data_bq(df, project_id, output_table, bq_table_schema=None):
     pandas_gbq.to_gbq(
@@ -28,6 +37,38 @@ def load_data_bq(project_id, gcp_region, input_table):
     return df
 
 
+def profile_data_bq(project_id, gcp_region, input_table):
+    # The profile is computed by a single query, so the data never leaves BigQuery
+    client = bigquery.Client(location=gcp_region, project=project_id)
+    schema = [
+        (field.name, field.field_type, field.mode)
+        for field in client.get_table(f"{project_id}.{input_table}").schema
+    ]
+    query = compile_profile_query(schema, f"`{project_id}.{input_table}`")
+    row = next(iter(client.query(query, location=gcp_region).result()))
+    logging.info(f"profiled {len(schema)} columns of {input_table}")
+    return parse_profile_row(dict(row.items()), schema)
+
+
+def transform_data_bq(project_id, gcp_region, input_table, output_table, transforms):
+    # Transforms that have a SQL equivalent are run inside BigQuery, so the data never leaves it.
+    # Otherwise the table is loaded, transformed with pandas and saved back.
+    client = bigquery.Client(location=gcp_region, project=project_id)
+    columns = [field.name for field in client.get_table(f"{project_id}.{input_table}").schema]
+
+    try:
+        select = compile_transforms(transforms, columns, f"`{project_id}.{input_table}`")
+    except NotCompilableError as e:
+        logging.info(f"falling back to pandas, transforms can not be pushed down to BigQuery: {e}")
+        df = load_data_bq(project_id, gcp_region, input_table)
+        save_data_bq(apply_transforms(df, transforms), project_id, output_table)
+        return
+
+    query = f"CREATE OR REPLACE TABLE `{project_id}.{output_table}` AS\n{select}"
+    client.query(query, location=gcp_region).result()
+    logging.info(f"saved_data_in {output_table} with query:\n{query}")
+
+
 if __name__ == '__main__':
     # You can run this code locally to quickly iterate on it
     load_data_bq(
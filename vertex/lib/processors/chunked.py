@@ -0,0 +1,174 @@
+import logging
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from vertex.lib.processors.push_down import NotCompilableError, tokenize_expression
+from vertex.lib.processors.transform_data import apply_transforms
+from vertex.lib.utils.artifact_io import buffer_size_for_budget, open_artifact
+
+
+# Row-wise transforms (see PROCESSORS in vertex.lib.processors.transform_data) give the same result whether they are
+# applied on the whole table or chunk by chunk. Streaming the chunks through generators keeps a single chunk in memory
+# at a time, so memory stays constant regardless of the table size.
+
+SAMPLE_ROWS = 1000
+# the values read_csv parses as missing by default
+DEFAULT_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA",
+    "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+# when a value of a later chunk does not fit the dtype inferred on the sample, the column falls back to a wider one
+FALLBACK_DTYPES = {"boolean": "str", "Int64": "float64", "float64": "str"}
+BOOLEAN_VALUES = {"true": True, "false": False}
+
+
+def read_csv_sample(uri: str, sample_rows: int = SAMPLE_ROWS) -> pd.DataFrame:
+    return pd.read_csv(uri, nrows=sample_rows)
+
+
+def get_transformed_columns(transforms: List[Dict], columns: List[str]) -> Optional[List[str]]:
+    """Returns the columns that transforms read or write, or None if an expression is too complex to tell."""
+    names = set()
+    for transform in transforms:
+        names.add(transform.get("column_name"))
+        for expression in (transform.get("expression"), transform.get("condition")):
+            if expression is None:
+                continue
+            try:
+                names.update(token for kind, token in tokenize_expression(expression) if kind == "name")
+            except NotCompilableError:
+                return None
+    return [column for column in columns if column in names]
+
+
+def infer_dtypes(sample: pd.DataFrame, transforms: List[Dict]) -> Dict[str, str]:
+    """Returns the dtypes of the columns that transforms use, as pandas infers them on the sample.
+
+    Integers and booleans are nullable, so that missing values in a later chunk do not turn them into floats, e.g. 1
+    into 1.0. The other columns are passed through as strings, which writes them back exactly as they were read.
+    """
+    transformed_columns = get_transformed_columns(transforms, list(sample.columns))
+    if transformed_columns is None:
+        transformed_columns = list(sample.columns)
+
+    dtypes = {}
+    for column in transformed_columns:
+        dtype = sample[column].dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            dtypes[column] = "boolean"
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[column] = "Int64"
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[column] = "float64"
+        else:
+            dtypes[column] = "str"
+    return dtypes
+
+
+def convert_column(series: pd.Series, dtype: str) -> pd.Series:
+    if dtype == "boolean":
+        values = series.str.lower().map(BOOLEAN_VALUES)
+        if values.isna().sum() != series.isna().sum():
+            raise ValueError(f"column {series.name!r} has values that are not booleans")
+        return values.astype("boolean")
+    return series.astype(dtype)
+
+
+def convert_chunks(chunks: Iterator[pd.DataFrame], dtypes: Dict[str, str]) -> Iterator[pd.DataFrame]:
+    dtypes = dict(dtypes)
+    for chunk in chunks:
+        for column, dtype in dtypes.items():
+            while True:
+                try:
+                    chunk[column] = convert_column(chunk[column], dtype)
+                    break
+                except (TypeError, ValueError):
+                    dtype = dtypes[column] = FALLBACK_DTYPES[dtype]
+                    logging.warning(f"column {column!r} does not fit the dtype inferred on the sample, using {dtype}")
+        yield chunk
+
+
+def estimate_chunk_rows(sample: pd.DataFrame, memory_budget_bytes: int) -> int:
+    """Returns how many rows like the ones of `sample` fit in `memory_budget_bytes` once loaded in a DataFrame."""
+    if sample.empty:
+        return SAMPLE_ROWS
+    bytes_per_row = sample.memory_usage(index=True, deep=True).sum() / len(sample)
+    return max(1, int(memory_budget_bytes // bytes_per_row))
+
+
+def read_csv_chunks(uri: str, chunk_rows: int, dtype=None, na_values: Optional[Dict[str, List[str]]] = None,
+                    **io_options) -> Iterator[pd.DataFrame]:
+    # with na_values, only the given values of the given columns are read as missing
+    read_options = {} if na_values is None else {"keep_default_na": False, "na_values": na_values}
+    with open_artifact(uri, "rb", **io_options) as f, \
+            pd.read_csv(f, chunksize=chunk_rows, dtype=dtype, **read_options) as reader:
+        yield from reader
+
+
+def transform_chunks(chunks: Iterator[pd.DataFrame], transforms: List[Dict]) -> Iterator[pd.DataFrame]:
+    for chunk in chunks:
+        yield apply_transforms(chunk, transforms)
+
+
+def write_csv_chunks(chunks: Iterator[pd.DataFrame], uri: str, **io_options) -> int:
+    # the output file is opened once and written sequentially, while its parts are uploaded in parallel
+    n_rows = 0
+    with open_artifact(uri, "w", **io_options) as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=i == 0, index=False)
+            n_rows += len(chunk)
+    return n_rows
+
+
+def transform_csv_chunked(input_uri: str, output_uri: str, transforms: List[Dict], memory_budget_bytes: int) -> int:
+    # dtypes are inferred once, otherwise a column could be parsed as int in a chunk and as float in the next one.
+    # Every column is read as a string, and only the ones that transforms use are converted.
+    sample = read_csv_sample(input_uri)
+    dtypes = infer_dtypes(sample, transforms)
+    na_values = {column: DEFAULT_NA_VALUES for column in dtypes}
+    # half of the budget goes to the chunk being transformed, the other half to the read and write buffers
+    chunk_rows = estimate_chunk_rows(sample.astype(str), memory_budget_bytes // 2)
+    io_buffer_size = buffer_size_for_budget(memory_budget_bytes // 2)
+    logging.info(f"transforming {input_uri} by chunks of {chunk_rows} rows, with {io_buffer_size} bytes I/O buffers")
+
+    chunks = read_csv_chunks(input_uri, chunk_rows, dtype=str, na_values=na_values, block_size=io_buffer_size)
+    chunks = convert_chunks(chunks, dtypes)
+    n_rows = write_csv_chunks(transform_chunks(chunks, transforms), output_uri, part_size=io_buffer_size)
+
+    logging.info(f"wrote {n_rows} rows to {output_uri}")
+    return n_rows
+
+
+if __name__ == '__main__':
+    # You can run this code locally to check that peak memory does not depend on the table size:
+    # PYTHONPATH=. python vertex/lib/processors/chunked.py 2000000
+    import os
+    import resource
+    import sys
+    import tempfile
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    memory_budget_bytes = 16 * 1024 ** 2
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path, output_path = os.path.join(tmp_dir, "input.csv"), os.path.join(tmp_dir, "output.csv")
+
+        # the input is generated by chunks too, so it does not weigh on the peak memory
+        chunk = pd.DataFrame({"one": range(100_000), "two": ["some text"] * 100_000})
+        with open(input_path, "w") as f:
+            for i in range(0, n_rows, len(chunk)):
+                chunk.to_csv(f, header=i == 0, index=False)
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        transform_csv_chunked(
+            input_path,
+            output_path,
+            [{"processor": "add_constant_column", "column_name": "new_column", "constant_value": "foo"}],
+            memory_budget_bytes,
+        )
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+        print(f"input size: {os.path.getsize(input_path) / 1024 ** 2:.0f}MB, "
+              f"memory budget: {memory_budget_bytes / 1024 ** 2:.0f}MB, "
+              f"peak RSS increase: {(rss_after - rss_before) / 1024 ** 2:.0f}MB")
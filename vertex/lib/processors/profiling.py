@@ -0,0 +1,421 @@
+import logging
+import math
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Column statistics are computed in a single pass over chunks of a table, with sketches that use a fixed amount of
+# memory whatever the number of rows, and that can be merged. A table can be profiled chunk by chunk, or shard by shard
+# in parallel tasks whose profiles are then merged into one.
+
+class Moments:
+    """Count, mean and variance with Welford's algorithm, merged with Chan's parallel formula."""
+
+    def __init__(self, count: int = 0, mean: float = 0., m2: float = 0.):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, values: np.ndarray):
+        if len(values):
+            chunk_mean = values.mean()
+            self.merge(Moments(len(values), float(chunk_mean), float(((values - chunk_mean) ** 2).sum())))
+
+    def merge(self, other: "Moments"):
+        count = self.count + other.count
+        if count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+            self.count = count
+
+    @property
+    def variance(self) -> Optional[float]:
+        # sample variance, like pandas
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    def to_dict(self) -> Dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    if pd.api.types.is_object_dtype(series):
+        # e.g. BigQuery NUMERIC and BIGNUMERIC columns, read as Decimal objects
+        return pd.api.types.infer_dtype(series, skipna=True) == "decimal"
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+class HyperLogLog:
+    """Approximate distinct count, with a relative error of about 1.04 / sqrt(2 ** precision).
+
+    Values are hashed as float64 if they are numeric and as strings otherwise, as hashes depend on the dtype: 1 in a
+    chunk read as int64 and 1.0 in a chunk read as float64 count as the same value.
+    """
+
+    def __init__(self, precision: int = 12, registers: Optional[List[int]] = None):
+        self.precision = precision
+        n_registers = 1 << precision
+        self.registers = np.zeros(n_registers, dtype=np.uint8) if registers is None else np.array(registers, np.uint8)
+
+    def update(self, series: pd.Series):
+        if series.empty:
+            return
+        series = series.astype(np.float64) if _is_numeric(series) else series.astype(str)
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy(np.uint64)
+        indexes = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        remaining_bits = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        ranks = (64 - self.precision) - _bit_length(remaining_bits) + 1
+        np.maximum.at(self.registers, indexes, ranks.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    @property
+    def estimate(self) -> float:
+        n_registers = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / n_registers)
+        estimate = alpha * n_registers ** 2 / np.sum(2. ** -self.registers.astype(np.float64))
+        n_empty_registers = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * n_registers and n_empty_registers:
+            # linear counting is more accurate for small cardinalities
+            estimate = n_registers * math.log(n_registers / n_empty_registers)
+        return float(estimate)
+
+    def to_dict(self) -> Dict:
+        return {"precision": self.precision, "registers": self.registers.tolist()}
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # exact for uint64, as each 32 bits half is exactly representable as a float64
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class KLL:
+    """Approximate quantiles with a KLL sketch: a stack of compactors where items at level h weigh 2 ** h.
+
+    When a level is full it is sorted and every other item is promoted to the next level, so the sketch size stays
+    bounded by about 3 * k items.
+    """
+
+    def __init__(self, k: int = 200, compactors: Optional[List[List[float]]] = None, seed: int = 0):
+        self.k = k
+        self.compactors = [np.array(compactor, dtype=np.float64) for compactor in (compactors or [[]])]
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    @property
+    def size(self) -> int:
+        return sum(len(compactor) for compactor in self.compactors)
+
+    @property
+    def max_size(self) -> int:
+        return sum(self.capacity(level) for level in range(len(self.compactors)))
+
+    def update(self, values: np.ndarray):
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.compress()
+
+    def merge(self, other: "KLL"):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], compactor])
+        self.compress()
+
+    def compress(self):
+        while self.size >= self.max_size:
+            for level in range(len(self.compactors)):
+                compactor = self.compactors[level]
+                if len(compactor) < self.capacity(level):
+                    continue
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+
+                # with an odd number of items, the last one stays at this level
+                n_compacted = len(compactor) - len(compactor) % 2
+                compacted = np.sort(compactor[:n_compacted])
+                offset = self.rng.integers(2)
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], compacted[offset::2]])
+                self.compactors[level] = compactor[n_compacted:]
+
+    def quantiles(self, qs: Iterable[float]) -> List[Optional[float]]:
+        items = np.concatenate(self.compactors)
+        if not len(items):
+            return [None for _ in qs]
+        weights = np.concatenate([np.full(len(compactor), 2. ** level) for level, compactor in enumerate(self.compactors)])
+        order = np.argsort(items)
+        items, cumulative_weights = items[order], np.cumsum(weights[order])
+        ranks = np.searchsorted(cumulative_weights, [q * cumulative_weights[-1] for q in qs], side="left")
+        return [float(items[min(rank, len(items) - 1)]) for rank in ranks]
+
+    def to_dict(self) -> Dict:
+        return {"k": self.k, "compactors": [compactor.tolist() for compactor in self.compactors]}
+
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+NUMERIC_BQ_TYPES = {"INTEGER", "INT64", "FLOAT", "FLOAT64", "NUMERIC", "BIGNUMERIC"}
+ORDERABLE_BQ_TYPES = NUMERIC_BQ_TYPES | {"STRING", "BOOLEAN", "BOOL", "DATE", "DATETIME", "TIME", "TIMESTAMP"}
+
+
+class ColumnProfile:
+    """Statistics of a column. Numeric statistics are only computed if all its non-null values are numeric.
+
+    The type of the column is unknown (numeric is None) until a chunk with non-null values is seen, as pandas reads a
+    chunk of nulls as float64. A numeric column is demoted to non-numeric if a later chunk is not numeric.
+    """
+
+    def __init__(self, numeric: Optional[bool] = None):
+        self.numeric = numeric
+        self.row_count = 0
+        self.null_count = 0
+        self.min = None
+        self.max = None
+        self.moments = Moments()
+        self.distinct = HyperLogLog()
+        self.quantiles = KLL()
+
+    def update(self, series: pd.Series):
+        values = series.dropna()
+        self.row_count += len(series)
+        self.null_count += len(series) - len(values)
+        if values.empty:
+            return
+
+        self._resolve_type(_is_numeric(values))
+        if self.numeric:
+            array = values.to_numpy(np.float64)
+            self.moments.update(array)
+            self.quantiles.update(array)
+            self._update_min_max(float(array.min()), float(array.max()))
+        else:
+            values = values.astype(str)
+            self._update_min_max(values.min(), values.max())
+        self.distinct.update(values)
+
+    def _resolve_type(self, numeric: Optional[bool]):
+        if numeric is None:
+            return
+        if self.numeric is None:
+            self.numeric = numeric
+        elif self.numeric and not numeric:
+            # numeric statistics do not make sense anymore, min and max are compared as strings from now on. Values seen
+            # so far only count through their numeric min and max, so these are approximate, e.g. "10" < "2" is missed
+            self.numeric = False
+            self.moments = Moments()
+            self.quantiles = KLL()
+            if self.min is not None:
+                self.min, self.max = str(self.min), str(self.max)
+
+    def _update_min_max(self, min_value, max_value):
+        self.min = min_value if self.min is None else min(self.min, min_value)
+        self.max = max_value if self.max is None else max(self.max, max_value)
+
+    def merge(self, other: "ColumnProfile"):
+        self.row_count += other.row_count
+        self.null_count += other.null_count
+        self._resolve_type(other.numeric)
+        if other.min is not None:
+            if self.numeric:
+                self._update_min_max(other.min, other.max)
+            else:
+                self._update_min_max(str(other.min), str(other.max))
+        if self.numeric:
+            self.moments.merge(other.moments)
+            self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+
+    def summary(self, qs=QUANTILES) -> Dict:
+        summary = {
+            "null_rate": self.null_count / self.row_count if self.row_count else None,
+            "min": self.min,
+            "max": self.max,
+            "approx_distinct": round(self.distinct.estimate),
+        }
+        if self.numeric:
+            summary.update({"mean": self.moments.mean if self.moments.count else None, "variance": self.moments.variance})
+            summary.update({f"p{round(q * 100)}": value for q, value in zip(qs, self.quantiles.quantiles(qs))})
+        return summary
+
+    def to_dict(self) -> Dict:
+        return {
+            "numeric": self.numeric,
+            "row_count": self.row_count,
+            "null_count": self.null_count,
+            "min": self.min,
+            "max": self.max,
+            "moments": self.moments.to_dict(),
+            "distinct": self.distinct.to_dict(),
+            "quantiles": self.quantiles.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ColumnProfile":
+        profile = cls(data["numeric"])
+        profile.row_count, profile.null_count = data["row_count"], data["null_count"]
+        profile.min, profile.max = data["min"], data["max"]
+        profile.moments = Moments(**data["moments"])
+        profile.distinct = HyperLogLog(**data["distinct"])
+        profile.quantiles = KLL(**data["quantiles"])
+        return profile
+
+
+class TableProfile:
+    def __init__(self, columns: Optional[Dict[str, ColumnProfile]] = None):
+        self.columns = columns or {}
+
+    def update(self, chunk):
+        # accepts pandas DataFrames as well as pyarrow Tables and RecordBatches
+        if hasattr(chunk, "to_pandas"):
+            chunk = chunk.to_pandas()
+        for column_name, series in chunk.items():
+            if column_name not in self.columns:
+                self.columns[column_name] = ColumnProfile()
+            self.columns[column_name].update(series)
+
+    def merge(self, other: "TableProfile"):
+        for column_name, column_profile in other.columns.items():
+            if column_name in self.columns:
+                self.columns[column_name].merge(column_profile)
+            else:
+                self.columns[column_name] = column_profile
+
+    def summary(self) -> Dict[str, Dict]:
+        return {column_name: column_profile.summary() for column_name, column_profile in self.columns.items()}
+
+    def to_dict(self) -> Dict:
+        return {column_name: column_profile.to_dict() for column_name, column_profile in self.columns.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TableProfile":
+        return cls({column_name: ColumnProfile.from_dict(column_data) for column_name, column_data in data.items()})
+
+
+def profile_chunks(chunks: Iterable) -> TableProfile:
+    profile = TableProfile()
+    for chunk in chunks:
+        profile.update(chunk)
+    logging.info(f"profiled {len(profile.columns)} columns")
+    return profile
+
+
+def merge_profiles(profiles: Iterable[TableProfile]) -> TableProfile:
+    merged_profile = TableProfile()
+    for profile in profiles:
+        merged_profile.merge(profile)
+    return merged_profile
+
+
+def compile_profile_query(schema: List[Tuple[str, str, str]], table: str) -> str:
+    """Compiles a query that computes the summary of every column inside BigQuery, so the data never leaves it.
+
+    `schema` lists the (name, field_type, mode) of the columns of the table. The query returns a single row, to be read
+    with `parse_profile_row`. Approximate statistics use BigQuery's own sketches, so they are close but not equal to
+    the ones of `TableProfile`.
+    """
+    selects = ["COUNT(*) AS row_count"]
+    for i, (name, field_type, mode) in enumerate(schema):
+        column = "`" + name.replace("`", "\\`") + "`"
+        if mode == "REPEATED" or field_type not in ORDERABLE_BQ_TYPES:
+            # arrays, structs, bytes, json and geographies are only counted
+            selects.append(f"COUNTIF({column} IS NULL) AS c{i}_null_count")
+            selects.append(f"APPROX_COUNT_DISTINCT(TO_JSON_STRING({column})) AS c{i}_approx_distinct")
+            continue
+
+        if field_type in ("FLOAT", "FLOAT64"):
+            # NaN is missing in pandas
+            column = f"IF(IS_NAN({column}), NULL, {column})"
+        elif field_type not in NUMERIC_BQ_TYPES:
+            column = f"CAST({column} AS STRING)"
+        selects.append(f"COUNTIF({column} IS NULL) AS c{i}_null_count")
+        selects.append(f"MIN({column}) AS c{i}_min")
+        selects.append(f"MAX({column}) AS c{i}_max")
+        selects.append(f"APPROX_COUNT_DISTINCT({column}) AS c{i}_approx_distinct")
+        if field_type in NUMERIC_BQ_TYPES:
+            selects.append(f"AVG({column}) AS c{i}_mean")
+            selects.append(f"VAR_SAMP({column}) AS c{i}_variance")
+            selects.append(f"APPROX_QUANTILES({column}, 100) AS c{i}_quantiles")
+    return "SELECT\n    " + ",\n    ".join(selects) + f"\nFROM {table}"
+
+
+def parse_profile_row(row: Dict, schema: List[Tuple[str, str, str]]) -> Dict[str, Dict]:
+    """Returns the summaries of the columns, like `TableProfile.summary`, from the result of `compile_profile_query`."""
+    def to_float(value):
+        return None if value is None else float(value)
+
+    summaries = {}
+    for i, (name, field_type, mode) in enumerate(schema):
+        summary = {"null_rate": row[f"c{i}_null_count"] / row["row_count"] if row["row_count"] else None}
+        numeric = mode != "REPEATED" and field_type in NUMERIC_BQ_TYPES
+        summary["min"] = to_float(row.get(f"c{i}_min")) if numeric else row.get(f"c{i}_min")
+        summary["max"] = to_float(row.get(f"c{i}_max")) if numeric else row.get(f"c{i}_max")
+        summary["approx_distinct"] = row[f"c{i}_approx_distinct"]
+        if numeric:
+            quantiles = row[f"c{i}_quantiles"]
+            summary.update({"mean": to_float(row[f"c{i}_mean"]), "variance": to_float(row[f"c{i}_variance"])})
+            summary.update({
+                f"p{round(q * 100)}": to_float(quantiles[round(q * 100)]) if quantiles else None for q in QUANTILES
+            })
+        summaries[name] = summary
+    return summaries
+
+
+def log_profile_metrics(profile: Union[TableProfile, Dict[str, Dict]], metrics):
+    # metrics is a kfp Metrics artifact, only numeric values can be logged. profile is a TableProfile or its summary
+    summaries = profile.summary() if isinstance(profile, TableProfile) else profile
+    for column_name, summary in summaries.items():
+        for name, value in summary.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metrics.log_metric(f"{column_name}.{name}", value)
+
+
+def profile_to_markdown(profile: Union[TableProfile, Dict[str, Dict]]) -> str:
+    summaries = profile.summary() if isinstance(profile, TableProfile) else profile
+    statistics = list(dict.fromkeys(name for summary in summaries.values() for name in summary))
+
+    def format_value(value):
+        if value is None:
+            return ""
+        if isinstance(value, float):
+            return f"{value:.4g}"
+        return str(value)
+
+    rows = "\n".join(
+        f"| {column_name} | " + " | ".join(format_value(summary.get(name)) for name in statistics) + " |"
+        for column_name, summary in summaries.items()
+    )
+    return f"""# Data profile
+
+| Column | {" | ".join(statistics)} |
+|--------|{"|".join("---" for _ in statistics)}|
+{rows}
+"""
+
+
+if __name__ == '__main__':
+    # You can run this code locally to check that memory does not grow with the number of rows
+    import tracemalloc
+
+    def generate_chunks(n_rows, chunk_rows=100_000):
+        rng = np.random.default_rng(0)
+        for start in range(0, n_rows, chunk_rows):
+            size = min(chunk_rows, n_rows - start)
+            yield pd.DataFrame({
+                "value": rng.normal(size=size),
+                "category": rng.integers(0, 10_000, size=size).astype(str),
+            })
+
+    for benchmark_rows in [100_000, 1_000_000, 10_000_000]:
+        tracemalloc.start()
+        benchmark_profile = profile_chunks(generate_chunks(benchmark_rows))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{benchmark_rows} rows, peak memory: {peak / 1024 ** 2:.1f}MB")
+
+    print(profile_to_markdown(benchmark_profile))
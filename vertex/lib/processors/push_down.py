@@ -0,0 +1,237 @@
+import math
+import re
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+
+# Transforms are described as a list of processor calls, e.g.
+# [{"processor": "add_constant_column", "column_name": "new_column", "constant_value": "foo"}]
+# The same description is applied with pandas by `apply_transforms` in vertex.lib.processors.transform_data, or
+# compiled here into a single SELECT statement that runs where the data lives.
+
+# Only the casts that give the same result as pandas `astype`. Casts to str and bool are not compilable: pandas
+# casts NaN to "nan" and any non-empty string to True, where SQL gives NULL, or fails.
+SQL_TYPES = {
+    "bigquery": {"int": "INT64", "float": "FLOAT64"},
+    "sqlite": {"int": "INTEGER", "float": "REAL"},
+}
+
+# Expressions and conditions are written in the subset of the pandas `eval`/`query` syntax that can be compiled to
+# SQL with the same result: column names, numbers, single-quoted strings, arithmetic (+ - * /), comparisons and
+# boolean operators. Anything else, e.g. `**`, `//`, function calls or chained comparisons, is not compilable.
+EXPRESSION_TOKEN = re.compile(
+    r"\s*(?:(?P<number>\d+(?:\.\d+)?)|(?P<string>'[^'\\]*')|(?P<name>[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<operator>\*\*|//|==|!=|<=|>=|<|>|\+|-|\*|/|\(|\)))"
+)
+COMPARISON_OPERATORS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+BOOLEAN_LITERALS = {"True": "TRUE", "False": "FALSE"}
+
+
+class NotCompilableError(ValueError):
+    pass
+
+
+def quote_identifier(name: str) -> str:
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+        raise NotCompilableError(f"column name {name!r} can not be used in SQL as is")
+    return f"`{name}`"
+
+
+def to_sql_literal(value, dialect: str) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and not math.isfinite(value):
+        raise NotCompilableError(f"constant {value!r} has no SQL literal")
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        if dialect == "bigquery":
+            return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+        return "'" + value.replace("'", "''") + "'"
+    raise NotCompilableError(f"constant {value!r} of type {type(value).__name__} has no SQL literal")
+
+
+def tokenize_expression(expression: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = EXPRESSION_TOKEN.match(expression, position)
+        if match is None:
+            raise NotCompilableError(f"can not compile expression {expression!r} at {expression[position:]!r}")
+        position = match.end()
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+    return tokens
+
+
+class ExpressionCompiler:
+    """Recursive descent compiler from a pandas expression to SQL, following Python operator precedence.
+
+    Column names are replaced with their current SQL definition. Comparisons are compiled so that NULL behaves like
+    NaN in pandas (`!=` is true, other comparisons are false) and divisions follow IEEE semantics like pandas
+    (x / 0 is +/-inf, 0 / 0 is NaN, NULL in sqlite), instead of being NULL or failing the query.
+    """
+
+    def __init__(self, expression: str, projections: Dict[str, str], dialect: str):
+        self.expression = expression
+        self.tokens = tokenize_expression(expression)
+        self.position = 0
+        self.projections = projections
+        self.dialect = dialect
+
+    def compile(self) -> str:
+        sql = self.compile_or()
+        if self.position < len(self.tokens):
+            self.fail()
+        return sql
+
+    def fail(self):
+        remaining = " ".join(token for _, token in self.tokens[self.position:]) or "end of expression"
+        raise NotCompilableError(f"can not compile expression {self.expression!r} at {remaining!r}")
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position][1] if self.position < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str]:
+        if self.position >= len(self.tokens):
+            self.fail()
+        self.position += 1
+        return self.tokens[self.position - 1]
+
+    def compile_or(self) -> str:
+        sql = self.compile_and()
+        while self.peek() == "or":
+            self.take()
+            sql = f"({sql} OR {self.compile_and()})"
+        return sql
+
+    def compile_and(self) -> str:
+        sql = self.compile_not()
+        while self.peek() == "and":
+            self.take()
+            sql = f"({sql} AND {self.compile_not()})"
+        return sql
+
+    def compile_not(self) -> str:
+        if self.peek() == "not":
+            self.take()
+            return f"(NOT {self.compile_not()})"
+        return self.compile_comparison()
+
+    def compile_comparison(self) -> str:
+        left = self.compile_additive()
+        if self.peek() not in COMPARISON_OPERATORS:
+            return left
+        operator = COMPARISON_OPERATORS[self.take()[1]]
+        right = self.compile_additive()
+        if self.peek() in COMPARISON_OPERATORS:
+            # chained comparisons have no direct SQL equivalent
+            self.fail()
+        return f"COALESCE({left} {operator} {right}, {'TRUE' if operator == '!=' else 'FALSE'})"
+
+    def compile_additive(self) -> str:
+        sql = self.compile_multiplicative()
+        while self.peek() in ("+", "-"):
+            operator = self.take()[1]
+            sql = f"({sql} {operator} {self.compile_multiplicative()})"
+        return sql
+
+    def compile_multiplicative(self) -> str:
+        sql = self.compile_unary()
+        while self.peek() in ("*", "/"):
+            operator = self.take()[1]
+            right = self.compile_unary()
+            sql = f"({sql} * {right})" if operator == "*" else self.compile_division(sql, right)
+        return sql
+
+    def compile_division(self, left: str, right: str) -> str:
+        if self.dialect == "bigquery":
+            return f"IEEE_DIVIDE({left}, {right})"
+        # sqlite returns NULL on a division by zero, and does an integer division on integers
+        return (
+            f"(CASE WHEN {right} = 0 THEN (CASE WHEN {left} > 0 THEN 9e999 WHEN {left} < 0 THEN -9e999 END) "
+            f"ELSE {left} * 1.0 / {right} END)"
+        )
+
+    def compile_unary(self) -> str:
+        if self.peek() in ("-", "+"):
+            operator = self.take()[1]
+            return f"({operator}{self.compile_unary()})"
+        return self.compile_primary()
+
+    def compile_primary(self) -> str:
+        kind, token = self.take()
+        if token == "(":
+            sql = self.compile_or()
+            if self.take()[1] != ")":
+                self.fail()
+            return sql
+        if kind in ("number", "string"):
+            return token
+        if kind == "name" and token in BOOLEAN_LITERALS:
+            return BOOLEAN_LITERALS[token]
+        if kind == "name" and token in self.projections:
+            return f"({self.projections[token]})"
+        if kind == "name" and token not in ("and", "or", "not"):
+            raise NotCompilableError(f"unknown column {token!r} in expression {self.expression!r}")
+        self.position -= 1
+        self.fail()
+
+
+def compile_expression(expression: str, projections: Dict[str, str], dialect: str) -> str:
+    """Translates a pandas expression into SQL, replacing column names with their current SQL definition."""
+    return ExpressionCompiler(expression, projections, dialect).compile()
+
+
+def compile_transforms(transforms: List[Dict], columns: List[str], source_table: str, dialect: str = "bigquery") -> str:
+    """Compiles row-wise transforms into a single SELECT statement over `source_table`.
+
+    `columns` are the columns of the source table, in order. Raises NotCompilableError if any transform has no SQL
+    equivalent, in which case the transforms should be applied with pandas instead.
+    """
+    projections = {column: quote_identifier(column) for column in columns}
+    conditions = []
+
+    for transform in transforms:
+        kwargs = dict(transform)
+        processor = kwargs.pop("processor", None)
+
+        if processor == "add_constant_column":
+            projections[kwargs["column_name"]] = to_sql_literal(kwargs["constant_value"], dialect)
+        elif processor == "add_expression_column":
+            projections[kwargs["column_name"]] = compile_expression(kwargs["expression"], projections, dialect)
+        elif processor == "cast_column":
+            column_name, dtype = kwargs["column_name"], kwargs["dtype"]
+            if column_name not in projections or dtype not in SQL_TYPES[dialect]:
+                raise NotCompilableError(f"can not cast column {column_name!r} to {dtype!r}")
+            sql = projections[column_name]
+            if dtype == "int" and dialect == "bigquery":
+                # BigQuery rounds floats when casting them to integers, where pandas (and sqlite) truncate them
+                sql = f"TRUNC({sql})"
+            projections[column_name] = f"CAST({sql} AS {SQL_TYPES[dialect][dtype]})"
+        elif processor == "filter_rows":
+            conditions.append(compile_expression(kwargs["condition"], projections, dialect))
+        else:
+            raise NotCompilableError(f"processor {processor!r} has no SQL equivalent")
+
+    select = ",\n    ".join(f"{sql} AS {quote_identifier(column)}" for column, sql in projections.items())
+    query = f"SELECT\n    {select}\nFROM {source_table}"
+    if conditions:
+        query += "\nWHERE " + " AND ".join(conditions)
+    return query
+
+
+def run_transforms_sqlite(df, transforms: List[Dict]):
+    """Runs the compiled transforms on a pandas DataFrame with an in-memory sqlite database.
+
+    This is a local stand-in for BigQuery, to check that the compiled SQL gives the same result as pandas.
+    """
+    import pandas as pd
+
+    with sqlite3.connect(":memory:") as connection:
+        df.to_sql("source", connection, index=False)
+        query = compile_transforms(transforms, list(df.columns), "source", dialect="sqlite")
+        return pd.read_sql_query(query, connection)
+
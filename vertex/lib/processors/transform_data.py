@@ -1,6 +1,11 @@
 import google.cloud.logging
-client = google.cloud.logging.Client()
-client.setup_logging()
+from google.auth.exceptions import DefaultCredentialsError
+try:
+    client = google.cloud.logging.Client()
+    client.setup_logging()
+except DefaultCredentialsError:
+    # running without GCP credentials, e.g. in tests: logs stay local
+    pass
 import logging
 
 
@@ -8,3 +13,37 @@ def add_constant_column(df, column_name, constant_value):
     df[column_name] = constant_value
     logging.info(f"added '{column_name}' column with constant value: {constant_value}")
     return df
+
+
+def add_expression_column(df, column_name, expression):
+    df[column_name] = df.eval(expression)
+    logging.info(f"added '{column_name}' column with expression: {expression}")
+    return df
+
+
+def cast_column(df, column_name, dtype):
+    df[column_name] = df[column_name].astype(dtype)
+    logging.info(f"cast '{column_name}' column to {dtype}")
+    return df
+
+
+def filter_rows(df, condition):
+    df = df.query(condition)
+    logging.info(f"kept {len(df)} rows matching: {condition}")
+    return df
+
+
+PROCESSORS = {
+    "add_constant_column": add_constant_column,
+    "add_expression_column": add_expression_column,
+    "cast_column": cast_column,
+    "filter_rows": filter_rows,
+}
+
+
+def apply_transforms(df, transforms):
+    # transforms are a list of processor calls, e.g. [{"processor": "add_constant_column", "column_name": ...}]
+    for transform in transforms:
+        kwargs = dict(transform)
+        df = PROCESSORS[kwargs.pop("processor")](df, **kwargs)
+    return df
@@ -0,0 +1,92 @@
+import itertools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+
+# Successive halving: every trial is first evaluated with a small budget (epochs, iterations, ...), then only the best
+# 1/eta of them are evaluated again with eta times more budget, and so on until the maximum budget is reached.
+# Hopeless trials are stopped early, and most of the compute goes to the most promising ones.
+
+def generate_trials(param_grid: Dict[str, List]) -> List[Dict]:
+    keys = list(param_grid)
+    return [
+        {"trial_id": trial_id, "params": dict(zip(keys, values))}
+        for trial_id, values in enumerate(itertools.product(*(param_grid[key] for key in keys)))
+    ]
+
+
+def rung_budgets(min_budget: int, max_budget: int, eta: int) -> List[int]:
+    """Returns the budget of every rung, multiplied by eta from one rung to the next, and ending at max_budget."""
+    budgets = [max_budget]
+    while budgets[-1] // eta >= min_budget:
+        budgets.append(budgets[-1] // eta)
+    return budgets[::-1]
+
+
+def _ranking_key(result: Dict, maximize: bool) -> float:
+    score = result["score"]
+    if score is None or math.isnan(score):
+        return math.inf
+    return -score if maximize else score
+
+
+def select_survivors(results: List[Dict], eta: int, maximize: bool = True) -> List[Dict]:
+    """Keeps the best 1/eta of the trials evaluated in a rung, to be evaluated in the next one with more budget.
+
+    Survivors keep the budget they were trained with and their model_uri, if any, so the next rung can continue
+    training from there instead of starting from scratch.
+    """
+    n_survivors = max(1, len(results) // eta)
+    ranked_results = sorted(results, key=lambda result: _ranking_key(result, maximize))
+    return [
+        {key: value for key, value in result.items() if key != "score"}
+        for result in ranked_results[:n_survivors]
+    ]
+
+
+def select_best(results: List[Dict], maximize: bool = True) -> Dict:
+    return min(results, key=lambda result: _ranking_key(result, maximize))
+
+
+def run_successive_halving(
+    trials: List[Dict],
+    objective: Callable[[Dict, int], float],
+    budgets: List[int],
+    eta: int,
+    parallelism: int = 4,
+    maximize: bool = True,
+) -> List[List[Dict]]:
+    """Runs successive halving locally, with at most `parallelism` trials evaluated at the same time.
+
+    `objective(params, budget)` returns the score of a trial. This follows the same scheduling as the
+    hyperparameter_sweep pipeline, where every rung is a dsl.ParallelFor, so a toy objective can be used to check the
+    pruning logic without running a pipeline. Returns the results of every rung.
+    """
+    rungs = []
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        for i, budget in enumerate(budgets):
+            scores = executor.map(lambda trial: objective(trial["params"], budget), trials)
+            results = [{**trial, "budget": budget, "score": score} for trial, score in zip(trials, scores)]
+            rungs.append(results)
+            if i < len(budgets) - 1:
+                trials = select_survivors(results, eta, maximize)
+    return rungs
+
+
+if __name__ == '__main__':
+    # You can run this code locally to iterate on the sweep logic with a toy objective
+    def toy_objective(params, budget):
+        # converges towards a score that is best for learning_rate=0.1 and depth=4
+        best_score = 1 - abs(math.log10(params["learning_rate"]) + 1) - abs(params["depth"] - 4) / 10
+        return best_score * (1 - math.exp(-budget / 30))
+
+    toy_rungs = run_successive_halving(
+        generate_trials({"learning_rate": [0.001, 0.01, 0.1, 1.], "depth": [2, 4, 6, 8]}),
+        toy_objective,
+        rung_budgets(min_budget=10, max_budget=90, eta=3),
+        eta=3,
+    )
+    for toy_results in toy_rungs:
+        print(f"budget {toy_results[0]['budget']}: {len(toy_results)} trials")
+    print(f"best trial: {select_best(toy_rungs[-1])}")
@@ -0,0 +1,29 @@
+import logging
+
+from sklearn.linear_model import SGDRegressor
+from sklearn.model_selection import train_test_split
+
+
+# This is an example of model training used by the hyperparameter sweep. The budget is the number of epochs, so
+# trials stopped early by successive halving only cost a fraction of a full training. A trial promoted to the next rung
+# continues from the model of the previous rung, so it only trains for the epochs it has not done yet.
+def train_and_evaluate(df, target_column, params, budget, model=None, trained_budget=0, eval_every=10,
+                       random_state=42):
+    X = df.drop(columns=[target_column])
+    y = df[target_column]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=random_state)
+
+    if model is None:
+        model = SGDRegressor(**params, random_state=random_state)
+        trained_budget = 0
+
+    # one epoch per partial_fit call, with the score reported every eval_every epochs as intermediate metrics
+    learning_curve = []
+    for epoch in range(trained_budget + 1, budget + 1):
+        model.partial_fit(X_train, y_train)
+        if epoch % eval_every == 0 or epoch == budget:
+            learning_curve.append({"epoch": epoch, "score": model.score(X_test, y_test)})
+    score = learning_curve[-1]["score"] if learning_curve else model.score(X_test, y_test)
+
+    logging.info(f"trained with {params} from {trained_budget} to {budget} epochs, R2 score: {score}")
+    return model, score, learning_curve
@@ -0,0 +1,327 @@
+import io
+import logging
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional, Tuple
+
+from fsspec import AbstractFileSystem
+from fsspec.core import url_to_fs
+from fsspec.implementations.dirfs import DirFileSystem
+from fsspec.implementations.local import LocalFileSystem
+
+
+# Artifacts are read by concurrent range requests and written as parts uploaded in parallel, so large artifacts can
+# use the network bandwidth of the machine instead of a single stream. The same code runs on a local directory, which
+# stands in for GCS in local runs and benchmarks.
+
+# memory used by a reader or a writer is bounded by about (MAX_WORKERS + 2) blocks or parts
+BLOCK_SIZE = 8 * 1024 ** 2
+PART_SIZE = 8 * 1024 ** 2
+MIN_BUFFER_SIZE = 256 * 1024
+MAX_WORKERS = 4
+# GCS can compose at most 32 objects in one request
+MAX_PARTS_PER_MERGE = 32
+
+
+def resolve_filesystem(uri_or_artifact, local_root: Optional[str] = None) -> Tuple[AbstractFileSystem, str]:
+    """Returns the fsspec filesystem and the path of an artifact, its uri, or its path.
+
+    Paths under the /gcs/ mount of Vertex are read from GCS directly rather than through the fuse mount. With
+    `local_root`, bucket paths are resolved in that local directory instead, e.g. gs://bucket/a in {local_root}/bucket/a.
+    """
+    uri = getattr(uri_or_artifact, "uri", uri_or_artifact)
+    if uri.startswith("/gcs/"):
+        uri = "gs://" + uri[len("/gcs/"):]
+
+    if local_root is not None:
+        return DirFileSystem(path=local_root, fs=LocalFileSystem(auto_mkdir=True)), uri.split("://", 1)[-1]
+
+    fs, path = url_to_fs(uri)
+    if isinstance(fs, LocalFileSystem):
+        # like on GCS, writing a file creates its parent directories
+        fs = LocalFileSystem(auto_mkdir=True)
+    return fs, path
+
+
+def buffer_size_for_budget(memory_budget_bytes: int, max_workers: int = MAX_WORKERS) -> int:
+    """Returns the block and part size for which a reader and a writer together fit in `memory_budget_bytes`."""
+    return max(MIN_BUFFER_SIZE, memory_budget_bytes // (2 * (max_workers + 2)))
+
+
+class ThroughputStats:
+    def __init__(self):
+        self.n_bytes = 0
+        self.start_time = time.perf_counter()
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.n_bytes / 1024 ** 2 / max(self.seconds, 1e-9)
+
+    def log(self, action: str, path: str):
+        logging.info(
+            f"{action} {self.n_bytes / 1024 ** 2:.1f}MB {path} in {self.seconds:.2f}s ({self.mb_per_second:.1f}MB/s)"
+        )
+
+
+class ParallelRangeReader(io.RawIOBase):
+    """Binary file object that reads a file by blocks, fetching the next `read_ahead` blocks concurrently."""
+
+    def __init__(self, fs: AbstractFileSystem, path: str, block_size: int = BLOCK_SIZE,
+                 max_workers: int = MAX_WORKERS, read_ahead: int = MAX_WORKERS):
+        super().__init__()
+        self.fs = fs
+        self.path = path
+        self.block_size = block_size
+        self.read_ahead = read_ahead
+        self.size = fs.size(path)
+        self.position = 0
+        self.stats = ThroughputStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._blocks = {}
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        elif whence == io.SEEK_END:
+            self.position = self.size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        return self.position
+
+    def _fetch_block(self, index: int) -> bytes:
+        start = index * self.block_size
+        return self.fs.cat_file(self.path, start=start, end=min(start + self.block_size, self.size))
+
+    def _schedule_blocks(self, index: int):
+        # only the current block and the ones read ahead are kept, so memory is bounded after a seek too
+        last_index = min(index + self.read_ahead, (self.size - 1) // self.block_size)
+        for block_index in list(self._blocks):
+            if not index <= block_index <= last_index:
+                self._blocks.pop(block_index).cancel()
+        for block_index in range(index, last_index + 1):
+            if block_index not in self._blocks:
+                self._blocks[block_index] = self._executor.submit(self._fetch_block, block_index)
+
+    def readinto(self, buffer) -> int:
+        if self.position >= self.size:
+            return 0
+
+        index = self.position // self.block_size
+        self._schedule_blocks(index)
+        block = self._blocks[index].result()
+
+        offset = self.position - index * self.block_size
+        n_bytes = min(len(buffer), len(block) - offset)
+        buffer[:n_bytes] = block[offset:offset + n_bytes]
+        self.position += n_bytes
+        self.stats.n_bytes += n_bytes
+        return n_bytes
+
+    def close(self):
+        if not self.closed:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._blocks.clear()
+            self.stats.log("read", self.path)
+        super().close()
+
+
+class ParallelMultipartWriter(io.RawIOBase):
+    """Binary file object that uploads a file by parts in parallel, and merges them into the file when closed.
+
+    At most `max_workers` parts are buffered in memory while they are uploaded. After `abort()`, closing deletes the
+    parts instead, so a failed write does not leave a truncated file behind.
+    """
+
+    def __init__(self, fs: AbstractFileSystem, path: str, part_size: int = PART_SIZE, max_workers: int = MAX_WORKERS):
+        super().__init__()
+        self.fs = fs
+        self.path = path
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self.stats = ThroughputStats()
+        self._buffer = bytearray()
+        self._parts_dir = f"{path}.parts-{uuid.uuid4().hex}"
+        self._parts = []
+        self._uploads = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.aborted = False
+
+    def writable(self) -> bool:
+        return True
+
+    def abort(self):
+        self.aborted = True
+        self._buffer.clear()
+
+    def write(self, data) -> int:
+        if self.aborted:
+            # data flushed by the buffered and text wrappers while they close is dropped
+            return len(data)
+        self._buffer.extend(data)
+        while len(self._buffer) >= self.part_size:
+            with memoryview(self._buffer) as view:
+                part = bytes(view[:self.part_size])
+            del self._buffer[:self.part_size]
+            self._upload_part(part)
+        return len(data)
+
+    def _upload_part(self, data: bytes):
+        while len(self._uploads) >= self.max_workers:
+            done, self._uploads = wait(self._uploads, return_when=FIRST_COMPLETED)
+            for upload in done:
+                upload.result()
+
+        part_path = f"{self._parts_dir}/{len(self._parts):06d}"
+        self._parts.append(part_path)
+        self._uploads.add(self._executor.submit(self.fs.pipe_file, part_path, data))
+        self.stats.n_bytes += len(data)
+
+    def _merge_parts(self):
+        if not hasattr(self.fs, "merge"):
+            with self.fs.open(self.path, "wb") as f:
+                for part in self._parts:
+                    f.write(self.fs.cat_file(part))
+            return
+
+        # server side compose, the data does not go through this machine again
+        parts = self._parts
+        while len(parts) > MAX_PARTS_PER_MERGE:
+            groups = [parts[i:i + MAX_PARTS_PER_MERGE] for i in range(0, len(parts), MAX_PARTS_PER_MERGE)]
+            parts = [f"{self._parts_dir}/group-{uuid.uuid4().hex}" for _ in groups]
+            list(self._executor.map(self.fs.merge, parts, groups))
+        self.fs.merge(self.path, parts)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self.aborted:
+                # uploads still running are waited for, so that their parts are deleted below
+                for upload in self._uploads:
+                    upload.cancel()
+                wait(self._uploads)
+                logging.info(f"aborted the write of {self.path}")
+                return
+            if not self._parts:
+                # small files are written in a single request
+                self.fs.pipe_file(self.path, bytes(self._buffer))
+                self.stats.n_bytes += len(self._buffer)
+            else:
+                if self._buffer:
+                    self._upload_part(bytes(self._buffer))
+                for upload in wait(self._uploads).done:
+                    upload.result()
+                self._merge_parts()
+            self.stats.log("wrote", self.path)
+        finally:
+            if self._parts and self.fs.exists(self._parts_dir):
+                self.fs.rm(self._parts_dir, recursive=True)
+            self._executor.shutdown(wait=True)
+            self._buffer.clear()
+            super().close()
+
+
+class _AbortOnError:
+    # leaving a `with` block on an exception aborts the write, instead of publishing what was written so far
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            getattr(self, "buffer", self).raw.abort()
+        return super().__exit__(exc_type, exc_value, traceback)
+
+
+class _BufferedArtifactWriter(_AbortOnError, io.BufferedWriter):
+    pass
+
+
+class _TextArtifactWriter(_AbortOnError, io.TextIOWrapper):
+    pass
+
+
+def open_artifact(uri_or_artifact, mode: str = "rb", local_root: Optional[str] = None, **kwargs):
+    """Opens an artifact for parallel reads ("rb", "r") or writes ("wb", "w"), e.g. `open_artifact(df_dataset, "w")`.
+
+    Keyword arguments are passed to ParallelRangeReader or ParallelMultipartWriter. Writes are only published if the
+    `with` block that opened the artifact exits without an exception.
+    """
+    fs, path = resolve_filesystem(uri_or_artifact, local_root)
+
+    if mode.strip("t") in ("r", "rb"):
+        binary = io.BufferedReader(ParallelRangeReader(fs, path, **kwargs))
+        text_wrapper = io.TextIOWrapper
+    elif mode.strip("t") in ("w", "wb"):
+        binary = _BufferedArtifactWriter(ParallelMultipartWriter(fs, path, **kwargs))
+        text_wrapper = _TextArtifactWriter
+    else:
+        raise ValueError(f"unsupported mode: {mode}")
+
+    return binary if "b" in mode else text_wrapper(binary, encoding="utf-8", newline="")
+
+
+if __name__ == '__main__':
+    # You can run this code locally to compare single stream and parallel throughputs. A local directory stands in
+    # for GCS, with a simulated latency and bandwidth per request, as local disks have neither:
+    # PYTHONPATH=. python vertex/lib/utils/artifact_io.py 256 50 100
+    import os
+    import sys
+    import tempfile
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    latency_seconds = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    stream_mb_per_second = float(sys.argv[3]) if len(sys.argv) > 3 else 100
+
+    class SimulatedObjectStore(DirFileSystem):
+        def cat_file(self, path, start=None, end=None, **kwargs):
+            data = super().cat_file(path, start=start, end=end, **kwargs)
+            time.sleep(latency_seconds + len(data) / 1024 ** 2 / stream_mb_per_second)
+            return data
+
+        def pipe_file(self, path, value, *args, **kwargs):
+            time.sleep(latency_seconds + len(value) / 1024 ** 2 / stream_mb_per_second)
+            return super().pipe_file(path, value, *args, **kwargs)
+
+        def merge(self, path, paths):
+            # like GCS compose, the parts are concatenated server side in a single request
+            time.sleep(latency_seconds)
+            with self.open(path, "wb") as f:
+                for part in paths:
+                    f.write(super().cat_file(part))
+
+    data = os.urandom(1024 ** 2) * size_mb
+    modes = [
+        ("single stream", {"max_workers": 1}, {"max_workers": 1, "read_ahead": 0}),
+        ("parallel", {}, {}),
+    ]
+    results = []
+
+    with tempfile.TemporaryDirectory() as local_root:
+        store = SimulatedObjectStore(path=local_root, fs=LocalFileSystem(auto_mkdir=True))
+        for name, writer_options, reader_options in modes:
+            writer = ParallelMultipartWriter(store, "bucket/artifact.bin", **writer_options)
+            writer.write(data)
+            writer.close()
+
+            reader = ParallelRangeReader(store, "bucket/artifact.bin", **reader_options)
+            assert reader.read() == data
+            reader.close()
+            results.append((name, writer.stats.mb_per_second, reader.stats.mb_per_second))
+
+    print(f"{size_mb}MB, {latency_seconds * 1000:.0f}ms latency, {stream_mb_per_second:.0f}MB/s per stream (simulated)")
+    print(f"{'':<15}{'write MB/s':>12}{'read MB/s':>12}")
+    for name, write_mb_per_second, read_mb_per_second in results:
+        print(f"{name:<15}{write_mb_per_second:>12.1f}{read_mb_per_second:>12.1f}")
@@ -0,0 +1,229 @@
+import json
+import logging
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+# The pipeline job is handled as a plain dict, as returned by `type(job).to_dict(job, use_integers_for_enums=False)`
+# on the `PipelineJob` message. This keeps the analysis independent from the Vertex SDK so it can be run locally
+# against a pipeline job recorded from a previous run.
+def pipeline_job_to_dict(pipeline_job) -> Dict:
+    gca_resource = pipeline_job.gca_resource
+    return type(gca_resource).to_dict(gca_resource, use_integers_for_enums=False)
+
+
+def parse_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+    if not timestamp:
+        return None
+    # protobuf timestamps can have up to 9 fractional digits, python only parses 6
+    timestamp = timestamp.rstrip("Z")
+    if "." in timestamp:
+        seconds, fraction = timestamp.split(".")
+        timestamp = f"{seconds}.{fraction[:6].ljust(6, '0')}"
+    return datetime.fromisoformat(timestamp)
+
+
+def get_task_dependencies(pipeline_spec: Dict) -> Dict[str, List[str]]:
+    """Returns the upstream executor tasks of every executor task in the pipeline spec.
+
+    Tasks nested in a sub-DAG (ExitHandler, Condition, ParallelFor, ...) inherit the dependencies of the task that
+    wraps them, and a dependency on a sub-DAG is replaced by a dependency on all the executor tasks it contains.
+    """
+    components = pipeline_spec.get("components", {})
+
+    def get_sub_dag_tasks(task: Dict) -> Optional[Dict]:
+        component = components.get(task.get("componentRef", {}).get("name"), {})
+        return component.get("dag", {}).get("tasks")
+
+    def get_executor_tasks(dag_tasks: Dict, task_name: str) -> List[str]:
+        sub_dag_tasks = get_sub_dag_tasks(dag_tasks[task_name])
+        if sub_dag_tasks is None:
+            return [task_name]
+        return [name for sub_task in sub_dag_tasks for name in get_executor_tasks(sub_dag_tasks, sub_task)]
+
+    dependencies = {}
+
+    def walk(dag_tasks: Dict, inherited_dependencies: List[str]):
+        for task_name, task in dag_tasks.items():
+            task_dependencies = list(inherited_dependencies)
+            for dependency in task.get("dependentTasks", []):
+                task_dependencies += get_executor_tasks(dag_tasks, dependency)
+
+            sub_dag_tasks = get_sub_dag_tasks(task)
+            if sub_dag_tasks is None:
+                dependencies[task_name] = task_dependencies
+            else:
+                walk(sub_dag_tasks, task_dependencies)
+
+    walk(pipeline_spec.get("root", {}).get("dag", {}).get("tasks", {}), [])
+    return dependencies
+
+
+def get_ancestors(task_details: List[Dict]) -> Dict[str, List[str]]:
+    """Returns the ids of the parent tasks of every task, from the pipeline root to its direct parent."""
+    parents = {task_detail["task_id"]: task_detail.get("parent_task_id") for task_detail in task_details}
+
+    def ancestors_of(task_id: str) -> List[str]:
+        parent_id = parents.get(task_id)
+        return ancestors_of(parent_id) + [parent_id] if parent_id in parents else []
+
+    return {task_id: ancestors_of(task_id) for task_id in parents}
+
+
+def compute_task_timings(task_details: List[Dict], dependencies: Dict[str, List[str]]) -> List[Dict]:
+    """Computes queue time (creation to start) and run time (start to end) of every executor task that has started.
+
+    Tasks that are not in `dependencies` (the pipeline root and sub-DAG tasks) are ignored, as well as tasks that
+    have not ended yet, like the exit handler computing the report. Iterations of a ParallelFor share the same task
+    name, so every timing is identified by its task id, and keeps the ids of its parent tasks.
+    """
+    ancestors = get_ancestors(task_details)
+    timings = []
+    for task_detail in task_details:
+        task_name = task_detail.get("task_name")
+        create_time = parse_timestamp(task_detail.get("create_time"))
+        start_time = parse_timestamp(task_detail.get("start_time"))
+        end_time = parse_timestamp(task_detail.get("end_time"))
+        if task_name not in dependencies or start_time is None or end_time is None:
+            continue
+
+        timings.append({
+            "task_id": task_detail["task_id"],
+            "task_name": task_name,
+            "ancestors": ancestors[task_detail["task_id"]],
+            "state": task_detail.get("state"),
+            "start_time": start_time,
+            "end_time": end_time,
+            "queue_seconds": (start_time - (create_time or start_time)).total_seconds(),
+            "run_seconds": (end_time - start_time).total_seconds(),
+        })
+    return timings
+
+
+def _shared_ancestors(timing: Dict, other_timing: Dict) -> int:
+    n_shared = 0
+    for ancestor, other_ancestor in zip(timing["ancestors"], other_timing["ancestors"]):
+        if ancestor != other_ancestor:
+            break
+        n_shared += 1
+    return n_shared
+
+
+def get_upstream_timings(timing: Dict, timings: List[Dict], dependencies: Dict[str, List[str]]) -> List[Dict]:
+    """Returns the task instances that `timing` depended on.
+
+    Within a ParallelFor, a task depends on the instance of its upstream task in the same iteration, i.e. the one
+    that shares the most parent tasks with it. A task after the ParallelFor depends on all the iterations.
+    """
+    upstream_timings = []
+    for dependency in set(dependencies.get(timing["task_name"], [])):
+        candidates = [candidate for candidate in timings if candidate["task_name"] == dependency]
+        if candidates:
+            max_shared = max(_shared_ancestors(timing, candidate) for candidate in candidates)
+            upstream_timings += [
+                candidate for candidate in candidates if _shared_ancestors(timing, candidate) == max_shared
+            ]
+    return upstream_timings
+
+
+def compute_critical_path(timings: List[Dict], dependencies: Dict[str, List[str]]) -> List[Dict]:
+    """Returns the chain of tasks that determined the pipeline duration, from first to last.
+
+    Starting from the task that ended last, we walk back through the upstream task that ended last, i.e. the one
+    that the task was waiting for before it could be scheduled.
+    """
+    if not timings:
+        return []
+
+    critical_path = [max(timings, key=lambda timing: timing["end_time"])]
+    while True:
+        upstream_timings = get_upstream_timings(critical_path[-1], timings, dependencies)
+        if not upstream_timings:
+            break
+        critical_path.append(max(upstream_timings, key=lambda timing: timing["end_time"]))
+
+    return critical_path[::-1]
+
+
+def build_run_report(pipeline_job: Dict) -> Dict:
+    dependencies = get_task_dependencies(pipeline_job.get("pipeline_spec", {}))
+    timings = compute_task_timings(pipeline_job.get("job_detail", {}).get("task_details", []), dependencies)
+    critical_path = compute_critical_path(timings, dependencies)
+
+    return {
+        "tasks": sorted(timings, key=lambda timing: timing["run_seconds"], reverse=True),
+        "critical_path": critical_path,
+        "critical_path_seconds": (
+            (critical_path[-1]["end_time"] - critical_path[0]["start_time"]).total_seconds() if critical_path else 0.
+        ),
+    }
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m{seconds:02d}s"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+def format_slack_summary(run_report: Dict, n_slowest_tasks: int = 5) -> str:
+    critical_path = " → ".join(timing["task_name"] for timing in run_report["critical_path"])
+    slowest_tasks = "\n".join(
+        f"    - *{timing['task_name']}:* {format_duration(timing['run_seconds'])} running, "
+        f"{format_duration(timing['queue_seconds'])} queued"
+        for timing in run_report["tasks"][:n_slowest_tasks]
+    )
+    return f"""*Critical path ({format_duration(run_report['critical_path_seconds'])}):* {critical_path}
+*Slowest tasks:*
+{slowest_tasks}
+"""
+
+
+def format_markdown_report(run_report: Dict) -> str:
+    critical_path_ids = {timing["task_id"] for timing in run_report["critical_path"]}
+    rows = "\n".join(
+        f"| {timing['task_name']} | {timing['state']} | {format_duration(timing['queue_seconds'])} "
+        f"| {format_duration(timing['run_seconds'])} | {'yes' if timing['task_id'] in critical_path_ids else ''} |"
+        for timing in run_report["tasks"]
+    )
+    critical_path = " → ".join(timing["task_name"] for timing in run_report["critical_path"])
+    return f"""# Pipeline run report
+
+**Critical path ({format_duration(run_report['critical_path_seconds'])}):** {critical_path}
+
+| Task | State | Queue time | Run time | On critical path |
+|------|-------|------------|----------|------------------|
+{rows}
+"""
+
+
+def format_run_report(pipeline_job, n_slowest_tasks: int = 5) -> Tuple[str, str]:
+    """Returns the Slack summary and the Markdown report of a pipeline job, or of its dict.
+
+    The exit handler must notify the end of the run whatever happens, so if the timings can not be computed, e.g. on
+    task details of an unexpected shape, the error is logged and both texts only say that timings are unavailable.
+    """
+    try:
+        if not isinstance(pipeline_job, dict):
+            pipeline_job = pipeline_job_to_dict(pipeline_job)
+        run_report = build_run_report(pipeline_job)
+        return format_slack_summary(run_report, n_slowest_tasks), format_markdown_report(run_report)
+    except Exception:
+        logging.exception("could not compute the timings of the run")
+        return (
+            "*Timings unavailable:* see the logs of the run report task.\n",
+            "# Pipeline run report\n\nTimings unavailable, see the logs of the run report task.\n",
+        )
+
+
+if __name__ == '__main__':
+    # You can run this code locally on a pipeline job recorded from a previous run with
+    # `json.dump(pipeline_job_to_dict(aiplatform.PipelineJob.get(resource_name)), f)`
+    with open(sys.argv[1]) as f:
+        recorded_pipeline_job = json.load(f)
+
+    print(format_markdown_report(build_run_report(recorded_pipeline_job)))
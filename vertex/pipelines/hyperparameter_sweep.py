@@ -0,0 +1,84 @@
+import os
+
+import kfp
+from kfp import compiler, dsl
+import google.cloud.aiplatform as aip
+
+
+from vertex.components.load_training_data import load_training_data_component
+from vertex.components.sweep import generate_trials_component, select_best_trial_component, select_survivors_component
+from vertex.components.train_and_evaluate import train_and_evaluate_component
+
+from vertex.lib.training.sweep import rung_budgets
+from vertex.lib.utils.config import load_config
+
+
+# The shape of the sweep is fixed when the pipeline is compiled: at most PARALLELISM trials run at the same time, and
+# only the best 1/ETA trials of a rung are evaluated in the next one, with ETA times more budget.
+PARALLELISM = 4
+ETA = 3
+BUDGETS = rung_budgets(min_budget=10, max_budget=270, eta=ETA)
+
+
+# This is a pipeline that searches for the best hyper-parameters of a model with successive halving.
+# The training set is loaded once, and every rung of the sweep fans the remaining trials out with a ParallelFor.
+@kfp.dsl.pipeline(name="hyperparameter-sweep")
+def pipeline(
+    project_id: str,
+
+    input_table: str,
+    target_column: str,
+
+    param_grid: dict
+):
+    load_training_data_task = load_training_data_component(
+        project_id=project_id,
+        gcp_region="europe-west1",
+        input_table=input_table,
+    )
+
+    trials = generate_trials_component(param_grid=param_grid).output
+
+    for i, budget in enumerate(BUDGETS):
+        with dsl.ParallelFor(trials, parallelism=PARALLELISM, name=f"rung-{i}-budget-{budget}") as trial:
+            train_and_evaluate_task = train_and_evaluate_component(
+                training_data=load_training_data_task.outputs["training_data"],
+                trial=trial,
+                budget=budget,
+                target_column=target_column,
+            )
+
+        results = dsl.Collected(train_and_evaluate_task.outputs["Output"])
+        if i < len(BUDGETS) - 1:
+            trials = select_survivors_component(results=results, eta=ETA).output
+
+    select_best_trial_component(results=results)
+
+
+if __name__ == '__main__':
+    PROJECT_ID = os.getenv("PROJECT_ID")
+    SELECTED_CONFIGURATION = load_config("hyperparameter_sweep", "conf_1")
+    PIPELINE_NAME = "hyperparameter_sweep"
+
+    BUCKET_NAME = f"gs://vertex-{PROJECT_ID}"
+    SERVICE_ACCOUNT = f"vertex@{PROJECT_ID}.iam.gserviceaccount.com"
+
+    compiler.Compiler().compile(pipeline_func=pipeline, package_path="./pipeline.json")
+    aip.init(project=PROJECT_ID, staging_bucket=BUCKET_NAME)
+
+    job = aip.PipelineJob(
+        display_name=PIPELINE_NAME,
+        template_path="pipeline.json".replace(" ", "_"),
+        pipeline_root=f"{BUCKET_NAME}/root",
+        location="europe-west1",
+        enable_caching=False,
+
+        parameter_values={
+            "project_id": PROJECT_ID,
+            "input_table": SELECTED_CONFIGURATION["INPUT_TABLE"],
+            "target_column": SELECTED_CONFIGURATION["TARGET_COLUMN"],
+            "param_grid": SELECTED_CONFIGURATION["PARAM_GRID"],
+        },
+    )
+
+    job.run(service_account=SERVICE_ACCOUNT)
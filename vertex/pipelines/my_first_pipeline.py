@@ -6,8 +6,11 @@ import google.cloud.aiplatform as aip
 
 
 from vertex.components.load_data import load_data_component
+from vertex.components.profile_data import profile_data_bq_component, profile_data_component
+from vertex.components.run_report import run_report_component
 from vertex.components.save_data import save_data_component
 from vertex.components.transform_data import transform_data_component
+from vertex.components.transform_data_bq import transform_data_bq_component
 
 from vertex.lib.utils.config import load_config
 
@@ -21,26 +24,57 @@ def pipeline(
     output_table: str,
 
     new_column_name: str,
-    new_column_value: str
-):
+    new_column_value: str,
 
-    load_data_task = load_data_component(
+    push_down: bool = False,
+    slack_webhook_url_secret_name: str = ""
+):
+    # Reports the final state and task timings of the run, whether it succeeded or failed
+    run_report_task = run_report_component(
         project_id=project_id,
-        gcp_region="europe-west1",
-        input_table=input_table,
-    )
-
-    transform_data_task = transform_data_component(
-        df=load_data_task.outputs["df_dataset"],
-        column_name=new_column_name,
-        constant_value=new_column_value
+        slack_webhook_url_secret_name=slack_webhook_url_secret_name
     )
 
-    save_data_component(
-        df_transformed=transform_data_task.outputs["df_transformed_dataset"],
-        project_id=project_id,
-        output_table=output_table
-    )
+    with kfp.dsl.ExitHandler(run_report_task, name="Exit Handler"):
+        # In push down mode the transform runs inside BigQuery and the data never leaves it
+        with kfp.dsl.Condition(push_down == True, name="push-down"):  # noqa: E712
+            transform_data_bq_task = transform_data_bq_component(
+                project_id=project_id,
+                gcp_region="europe-west1",
+                input_table=input_table,
+                output_table=output_table,
+                column_name=new_column_name,
+                constant_value=new_column_value
+            )
+
+            # the output table only exists once the transform is done, so it is profiled afterwards
+            profile_data_bq_component(
+                project_id=project_id,
+                gcp_region="europe-west1",
+                input_table=output_table,
+            ).after(transform_data_bq_task)
+
+        with kfp.dsl.Condition(push_down == False, name="pandas"):  # noqa: E712
+            load_data_task = load_data_component(
+                project_id=project_id,
+                gcp_region="europe-west1",
+                input_table=input_table,
+            )
+
+            transform_data_task = transform_data_component(
+                df=load_data_task.outputs["df_dataset"],
+                column_name=new_column_name,
+                constant_value=new_column_value
+            )
+
+            save_data_component(
+                df_transformed=transform_data_task.outputs["df_transformed_dataset"],
+                project_id=project_id,
+                output_table=output_table
+            )
+
+            # profiling runs in parallel with the save, so it does not add to the pipeline duration
+            profile_data_component(df=transform_data_task.outputs["df_transformed_dataset"])
 
 
 if __name__ == '__main__':
@@ -66,7 +100,8 @@ if __name__ == '__main__':
             "input_table": SELECTED_CONFIGURATION["INPUT_TABLE"],
             "output_table": SELECTED_CONFIGURATION["OUTPUT_TABLE"],
             "new_column_name": SELECTED_CONFIGURATION["NEW_COLUMN_NAME"],
-            "new_column_value": SELECTED_CONFIGURATION["NEW_COLUMN_VALUE"]
+            "new_column_value": SELECTED_CONFIGURATION["NEW_COLUMN_VALUE"],
+            "push_down": SELECTED_CONFIGURATION["PUSH_DOWN"]
         },
     )
 